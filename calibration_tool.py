@@ -13,6 +13,7 @@ import math
 import time
 from datetime import datetime
 from config_loader import load_config
+from camera_capture import open_frame_source
 
 
 def find_longest_axis(contour, center):
@@ -74,10 +75,8 @@ def main():
     print("  [Q/ESC] 종료")
     print("")
     
-    # 카메라 초기화
-    cap = cv2.VideoCapture(cam_cfg.get("camera_number", 0))
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, cam_cfg.get("width", 640))
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cam_cfg.get("height", 480))
+    # 카메라 초기화 (camera.source가 frame_bus면 main.py 실행 중에도 사용 가능)
+    cap = open_frame_source(cam_cfg)
     
     if not cap.isOpened():
         print("[ERROR] 카메라를 열 수 없습니다.")
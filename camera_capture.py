@@ -0,0 +1,129 @@
+"""
+camera_capture.py
+------------------------------------
+카메라 입력 소스 모듈
+- device: cv2.VideoCapture로 카메라 직접 열기
+  · camera.capture_profile로 선택한 캡처 프로파일 적용
+    (백엔드, FOURCC, 버퍼 크기, 목표 FPS, 고정 노출)
+  · 적용 후 실제 값을 다시 읽어서 출력 (드라이버가 무시한 설정 확인)
+- frame_bus: 캡처 데몬(frame_bus.py serve)이 공유 메모리에 쓰는 프레임 구독
+  → 여러 프로그램(main.py, calibration_tool.py, 녹화기)이 카메라 하나를 공유
+------------------------------------
+"""
+
+import cv2
+
+
+# 캡처 백엔드 이름 → OpenCV API 상수
+BACKENDS = {
+    "any": cv2.CAP_ANY,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+    "v4l2": cv2.CAP_V4L2,
+    "gstreamer": cv2.CAP_GSTREAMER,
+    "ffmpeg": cv2.CAP_FFMPEG,
+    "avfoundation": cv2.CAP_AVFOUNDATION,
+}
+
+# CAP_PROP_AUTO_EXPOSURE 값은 백엔드마다 다름 (수동, 자동)
+AUTO_EXPOSURE_VALUES = {
+    "v4l2": (1, 3),
+    "default": (0.25, 0.75),
+}
+
+
+def decode_fourcc(value):
+    """CAP_PROP_FOURCC 실수값 → 'MJPG' 같은 문자열"""
+    code = int(value)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+def get_capture_profile(cam_cfg, profile_name=None):
+    """camera.capture_profiles에서 프로파일 선택 (이름, 설정) 반환"""
+    name = profile_name or cam_cfg.get("capture_profile", "default")
+    profiles = cam_cfg.get("capture_profiles", {})
+    if name not in profiles and name != "default":
+        print(f"[Camera] ⚠️  Capture profile '{name}' not found, using driver defaults")
+    return name, profiles.get(name, {})
+
+
+def read_back(cap):
+    """현재 캡처 설정 실제 값"""
+    return {
+        "backend": cap.getBackendName() if cap.isOpened() else "",
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fourcc": decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "buffer_size": cap.get(cv2.CAP_PROP_BUFFERSIZE),
+        "auto_exposure": cap.get(cv2.CAP_PROP_AUTO_EXPOSURE),
+        "exposure": cap.get(cv2.CAP_PROP_EXPOSURE),
+    }
+
+
+def open_capture(cam_cfg, profile_name=None):
+    """
+    카메라 장치 열기 (해상도 + 캡처 프로파일 적용)
+
+    프로파일 키 (모두 선택 사항, 없으면 드라이버 기본값):
+        backend: any / dshow / msmf / v4l2 / gstreamer / ffmpeg / avfoundation
+        fourcc: "MJPG" / "YUYV" 등
+        fps: 목표 FPS
+        buffer_size: 드라이버 내부 프레임 버퍼 수 (1이면 항상 최신 프레임)
+        auto_exposure: false면 수동 노출
+        exposure: 수동 노출값 (백엔드별 단위 다름, DSHOW는 log2 초: -6 ≈ 1/64s)
+    """
+    name, profile = get_capture_profile(cam_cfg, profile_name)
+    backend_name = profile.get("backend", "any")
+    cap = cv2.VideoCapture(cam_cfg.get("camera_number", 0), BACKENDS.get(backend_name, cv2.CAP_ANY))
+
+    # FOURCC는 해상도보다 먼저 설정해야 적용되는 백엔드가 있음
+    if profile.get("fourcc"):
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile["fourcc"]))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, cam_cfg.get("width", 640))
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cam_cfg.get("height", 480))
+    if profile.get("fps"):
+        cap.set(cv2.CAP_PROP_FPS, profile["fps"])
+    if profile.get("buffer_size"):
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, profile["buffer_size"])
+    if "auto_exposure" in profile:
+        manual, auto = AUTO_EXPOSURE_VALUES.get(backend_name, AUTO_EXPOSURE_VALUES["default"])
+        cap.set(cv2.CAP_PROP_AUTO_EXPOSURE, auto if profile["auto_exposure"] else manual)
+    if "exposure" in profile and not profile.get("auto_exposure", False):
+        cap.set(cv2.CAP_PROP_EXPOSURE, profile["exposure"])
+
+    if cap.isOpened():
+        actual = read_back(cap)
+        print(f"[Camera] Capture profile '{name}' (backend: {actual['backend']})")
+        requested = {
+            "width": cam_cfg.get("width", 640),
+            "height": cam_cfg.get("height", 480),
+            "fourcc": profile.get("fourcc"),
+            "fps": profile.get("fps"),
+            "buffer_size": profile.get("buffer_size"),
+            "exposure": profile.get("exposure"),
+        }
+        for key, want in requested.items():
+            got = actual[key]
+            mark = ""
+            if want is not None and str(want) != str(got) and not (
+                    isinstance(want, (int, float)) and isinstance(got, (int, float)) and abs(want - got) < 0.5):
+                mark = "  ⚠️  requested " + str(want)
+            print(f"  {key:>12}: {got}{mark}")
+        print(f"  {'auto_exp':>12}: {actual['auto_exposure']}")
+    return cap
+
+
+def open_frame_source(cam_cfg):
+    """
+    camera.source 설정에 따라 프레임 소스 반환
+    반환 객체는 cv2.VideoCapture와 같은 read() / isOpened() / release() 제공
+    """
+    source = cam_cfg.get("source", "device")
+    if source == "frame_bus":
+        from frame_bus import FrameBusReader, DEFAULT_BUS_NAME
+        bus_cfg = cam_cfg.get("frame_bus", {})
+        name = bus_cfg.get("name", DEFAULT_BUS_NAME)
+        print(f"[Camera] Using shared frame bus '{name}'")
+        return FrameBusReader(name, timeout=bus_cfg.get("read_timeout_sec", 2.0))
+    return open_capture(cam_cfg)
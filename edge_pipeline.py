@@ -0,0 +1,221 @@
+"""
+edge_pipeline.py
+------------------------------------
+경계 검출 전처리 모듈
+- GaussianBlur → Canny → dilate/erode/close 체인
+- 타일 병렬 모드: 프레임을 겹치는 가로 타일로 나누어 스레드 풀에서 처리
+  (OpenCV 함수는 GIL을 해제하므로 스레드로 CPU 코어 병렬 처리 가능)
+  1) 타일별 GaussianBlur + Sobel(dx, dy)
+  2) 전체 프레임 Canny(dx, dy) - NMS + 히스테리시스 (타일 경계를 넘어 엣지가 이어지므로 분할 불가)
+  3) 타일별 dilate/erode/close
+- 타일 결과는 겹침 영역을 잘라내고 이어붙여 경계선(seam) 없이 합성
+- 단일 스레드 결과와 픽셀 단위로 동일한지 주기적 검증
+
+사용법 (벤치마크 + 검증):
+    python edge_pipeline.py frame.png --tiles 4 --overlap 32 --repeat 50
+------------------------------------
+"""
+
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+MORPH_KERNEL_SIZE = 5  # edge_detection.morph_kernel_size 기본값
+MORPH_ITERATIONS = 2
+
+
+def morph_kernel(edge_cfg):
+    """모폴로지 연산 커널 (edge_detection.morph_kernel_size × 같은 크기 사각형)"""
+    size = edge_cfg.get("morph_kernel_size", MORPH_KERNEL_SIZE)
+    return cv2.getStructuringElement(cv2.MORPH_RECT, (size, size))
+
+
+def extract_edges(gray, edge_cfg, buffers=None):
+    """
+    단일 스레드 전처리 체인 (run_vision_loop 기준 구현)
+
+    buffers: 재사용할 출력 버퍼 딕셔너리 (같은 크기 프레임 반복 처리 시 할당 생략)
+             반환값은 buffers["edges"]를 가리키므로 다음 호출 전에 사용/복사해야 함
+    """
+    if buffers is None:
+        buffers = {}
+    blurred = cv2.GaussianBlur(gray, (edge_cfg["gaussian_blur_kernel"],) * 2, 0, dst=buffers.get("blurred"))
+    canny = cv2.Canny(blurred, edge_cfg["canny_threshold1"], edge_cfg["canny_threshold2"], edges=buffers.get("canny"))
+
+    # Morphological operations: 작은 디테일 제거, 외곽선만 남김
+    kernel = morph_kernel(edge_cfg)
+    morph = cv2.dilate(canny, kernel, dst=buffers.get("morph"), iterations=MORPH_ITERATIONS)  # 엣지 확장
+    edges = cv2.erode(morph, kernel, dst=buffers.get("edges"), iterations=MORPH_ITERATIONS)   # 다시 축소 (구멍 메우기)
+    edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, dst=edges)  # 닫기 연산
+
+    buffers["blurred"], buffers["canny"], buffers["morph"], buffers["edges"] = blurred, canny, morph, edges
+    return edges
+
+
+def min_tile_overlap(edge_cfg):
+    """
+    타일 경계에서 결과가 달라지지 않기 위한 최소 겹침 (px)
+    - 1단계: GaussianBlur 반경 + Sobel 3x3 반경(1px)
+    - 3단계: 모폴로지 연산 누적 반경 (dilate ×2, erode ×2, close)
+    """
+    blur_r = edge_cfg["gaussian_blur_kernel"] // 2
+    morph_r = edge_cfg.get("morph_kernel_size", MORPH_KERNEL_SIZE) // 2
+    morph_total = morph_r * (MORPH_ITERATIONS * 2 + 2)
+    return max(blur_r + 1, morph_total)
+
+
+def tile_bounds(height, tiles, overlap):
+    """가로 타일 범위 목록 [(core_y0, core_y1, pad_y0, pad_y1), ...]"""
+    bounds = []
+    step = int(np.ceil(height / tiles))
+    for y0 in range(0, height, step):
+        y1 = min(height, y0 + step)
+        bounds.append((y0, y1, max(0, y0 - overlap), min(height, y1 + overlap)))
+    return bounds
+
+
+class TiledEdgeExtractor:
+    """
+    타일 병렬 경계 검출기
+
+    edge_cfg 키:
+        tiles: 타일 수 (1이면 단일 스레드)
+        tile_overlap: 타일 간 겹침 (px, min_tile_overlap보다 작으면 자동 보정)
+        tile_verify_interval: N프레임마다 단일 스레드 결과와 비교 (0이면 검증 안함)
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self._pool = None
+        self._pool_size = 0
+        self.frame_count = 0
+        self.verified_frames = 0
+        self.mismatch_frames = 0
+        self.disabled = False  # 검증 실패 시 단일 스레드로 전환
+
+    def _get_pool(self, tiles):
+        workers = self.max_workers or tiles
+        if self._pool is None or self._pool_size < workers:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="edge-tile")
+            self._pool_size = workers
+        return self._pool
+
+    def extract(self, gray, edge_cfg):
+        """edge_cfg 설정에 따라 단일/타일 병렬 모드로 경계 검출"""
+        tiles = int(edge_cfg.get("tiles", 1))
+        self.frame_count += 1
+        if tiles <= 1 or self.disabled:
+            return extract_edges(gray, edge_cfg)
+
+        edges = self.extract_tiled(gray, edge_cfg, tiles, edge_cfg.get("tile_overlap", 0))
+
+        verify_interval = int(edge_cfg.get("tile_verify_interval", 0))
+        if verify_interval > 0 and (self.frame_count - 1) % verify_interval == 0:
+            reference = extract_edges(gray, edge_cfg)
+            self.verified_frames += 1
+            diff = int(np.count_nonzero(edges != reference))
+            if diff:
+                self.mismatch_frames += 1
+                self.disabled = True
+                print(f"[Edge] ⚠️  Tiled edge map differs from single-thread result ({diff} px). "
+                      f"Falling back to single-thread mode (increase tile_overlap).")
+                return reference
+        return edges
+
+    def extract_tiled(self, gray, edge_cfg, tiles, overlap=0):
+        """겹치는 가로 타일로 나누어 병렬 처리 후 합성"""
+        H = gray.shape[0]
+        overlap = max(int(overlap), min_tile_overlap(edge_cfg))
+        bounds = tile_bounds(H, tiles, overlap)
+        pool = self._get_pool(len(bounds))
+        ksize = (edge_cfg["gaussian_blur_kernel"],) * 2
+        kernel = morph_kernel(edge_cfg)
+
+        dx = np.empty(gray.shape[:2], dtype=np.int16)
+        dy = np.empty(gray.shape[:2], dtype=np.int16)
+        out = np.empty(gray.shape[:2], dtype=np.uint8)
+
+        # 1단계: 타일별 blur + 그래디언트
+        # Canny 내부 Sobel과 동일하게 BORDER_REPLICATE 사용 → Canny(image)와 동일한 결과
+        def gradient_tile(b):
+            y0, y1, py0, py1 = b
+            blurred = cv2.GaussianBlur(gray[py0:py1], ksize, 0)
+            tdx = cv2.Sobel(blurred, cv2.CV_16S, 1, 0, ksize=3, borderType=cv2.BORDER_REPLICATE)
+            tdy = cv2.Sobel(blurred, cv2.CV_16S, 0, 1, ksize=3, borderType=cv2.BORDER_REPLICATE)
+            # 겹침 영역은 버리고 코어 영역만 기록 → 경계선 없음
+            dx[y0:y1] = tdx[y0 - py0:y1 - py0]
+            dy[y0:y1] = tdy[y0 - py0:y1 - py0]
+
+        for f in [pool.submit(gradient_tile, b) for b in bounds]:
+            f.result()
+
+        # 2단계: 전체 프레임 NMS + 히스테리시스
+        edges = cv2.Canny(dx, dy, edge_cfg["canny_threshold1"], edge_cfg["canny_threshold2"])
+
+        # 3단계: 타일별 모폴로지
+        def morph_tile(b):
+            y0, y1, py0, py1 = b
+            tile = cv2.dilate(edges[py0:py1], kernel, iterations=MORPH_ITERATIONS)
+            tile = cv2.erode(tile, kernel, iterations=MORPH_ITERATIONS)
+            tile = cv2.morphologyEx(tile, cv2.MORPH_CLOSE, kernel)
+            out[y0:y1] = tile[y0 - py0:y1 - py0]
+
+        for f in [pool.submit(morph_tile, b) for b in bounds]:
+            f.result()
+        return out
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+def main():
+    from config_loader import load_config
+
+    parser = argparse.ArgumentParser(description="타일 병렬 경계 검출 벤치마크 및 검증")
+    parser.add_argument("image", help="입력 이미지 (컬러 또는 흑백)")
+    parser.add_argument("--tiles", type=int, default=4)
+    parser.add_argument("--overlap", type=int, default=0, help="타일 겹침 (px, 0이면 최소값 자동)")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=1.0, help="입력 이미지 배율 (예: 3 → 1080p 이상 테스트)")
+    args = parser.parse_args()
+
+    edge_cfg = load_config()["edge_detection"]
+    frame = cv2.imread(args.image)
+    if frame is None:
+        print(f"[ERROR] 이미지를 읽을 수 없습니다: {args.image}")
+        return
+    if args.scale != 1.0:
+        frame = cv2.resize(frame, None, fx=args.scale, fy=args.scale, interpolation=cv2.INTER_LINEAR)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    extractor = TiledEdgeExtractor()
+    overlap = max(args.overlap, min_tile_overlap(edge_cfg))
+    print(f"[Edge] Frame {gray.shape[1]}x{gray.shape[0]}, tiles={args.tiles}, overlap={overlap}px")
+
+    reference = extract_edges(gray, edge_cfg)
+    tiled = extractor.extract_tiled(gray, edge_cfg, args.tiles, overlap)
+    diff = int(np.count_nonzero(tiled != reference))
+    print(f"[Edge] Verify: {'IDENTICAL' if diff == 0 else f'MISMATCH ({diff} px)'}")
+
+    for name, fn in (("single", lambda: extract_edges(gray, edge_cfg)),
+                     ("tiled", lambda: extractor.extract_tiled(gray, edge_cfg, args.tiles, overlap))):
+        fn()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        ms = (time.perf_counter() - start) / args.repeat * 1000.0
+        print(f"[Edge] {name:>6}: {ms:.2f} ms/frame")
+
+    extractor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 firebase_manager.py
 ------------------------------------
 Firebase 연동 모듈
-- 초기화
+- 초기화 (주문 저장소 백엔드 선택: firebase / local)
 - Pose 전송
 - 주문 상태 모니터링 (waiting_pose 감지)
 ------------------------------------
@@ -11,30 +11,56 @@ Firebase 연동 모듈
 import os
 import time
 import threading
-import firebase_admin
-from firebase_admin import credentials, db
+from order_store import FirebaseOrderStore, LocalOrderStore
+
+
+DEFAULT_DATABASE_URL = "https://servingstation-default-rtdb.asia-southeast1.firebasedatabase.app"
+DEFAULT_KEY_FILE = "servingstation-firebase-adminsdk-fbsvc-231e400af8.json"
 
 
 # ✅ Firebase 초기화
-def init_firebase():
-    """Firebase 초기화 및 /orders 참조 반환"""
+def init_firebase(database_url=DEFAULT_DATABASE_URL, key_file=DEFAULT_KEY_FILE):
+    """Firebase 초기화 및 /orders 저장소 반환"""
+    # local 백엔드는 firebase_admin 없이도 동작하도록 여기서 임포트
+    import firebase_admin
+    from firebase_admin import credentials, db
+
     base = os.path.dirname(os.path.abspath(__file__))
-    key_path = os.path.join(base, "servingstation-firebase-adminsdk-fbsvc-231e400af8.json")
+    key_path = os.path.join(base, key_file)
 
     if not firebase_admin._apps:
         cred = credentials.Certificate(key_path)
         firebase_admin.initialize_app(cred, {
-            "databaseURL": "https://servingstation-default-rtdb.asia-southeast1.firebasedatabase.app"
+            "databaseURL": database_url
         })
         print("[Firebase] Initialized successfully!")
     else:
         print("[Firebase] Already initialized (using existing app)")
 
-    return db.reference("/orders")
+    return FirebaseOrderStore(db.reference("/orders"))
+
+
+# ✅ 주문 저장소 초기화
+def init_order_store(config):
+    """config.json의 order_store.backend에 따라 주문 저장소 반환"""
+    store_cfg = config.get("order_store", {})
+    backend = store_cfg.get("backend", "firebase")
+
+    if backend == "local":
+        local_path = store_cfg.get("local_path")
+        if local_path and not os.path.isabs(local_path):
+            local_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), local_path)
+        print(f"[OrderStore] Using local backend ({local_path or 'in-memory'})")
+        return LocalOrderStore(local_path)
+
+    return init_firebase(
+        store_cfg.get("database_url", DEFAULT_DATABASE_URL),
+        store_cfg.get("credential_file", DEFAULT_KEY_FILE),
+    )
 
 
 # ✅ Pose 데이터 전송
-def send_to_firebase(orders_ref, order_id, x, y, z, roll, pitch, yaw):
+def send_to_firebase(orders_ref, order_id, x, y, z, roll, pitch, yaw, verbose=True):
     """Firebase에 로봇 팔 pose 데이터 전송"""
     pose_data = {
         "type": "coords",
@@ -48,17 +74,22 @@ def send_to_firebase(orders_ref, order_id, x, y, z, roll, pitch, yaw):
         ]
     }
 
-    orders_ref.child(order_id).update({"pose": pose_data})
-    print(f"[Firebase] Sent pose to {order_id}:")
-    print(f"           X={x:.1f}, Y={y:.1f}, Z={z:.1f}, R={roll:.1f}, P={pitch:.1f}, Y={yaw:.1f}")
+    orders_ref.update(order_id, {"pose": pose_data})
+    if verbose:
+        print(f"[Firebase] Sent pose to {order_id}:")
+        print(f"           X={x:.1f}, Y={y:.1f}, Z={z:.1f}, R={roll:.1f}, P={pitch:.1f}, Y={yaw:.1f}")
 
 
 # ✅ 주문 상태 모니터링
 class FirebaseMonitor:
     """Firebase /orders 구조 모니터링 (waiting_pose 감지)"""
 
-    def __init__(self, orders_ref):
+    def __init__(self, orders_ref, tracer=None, poll_interval=0.5, verbose=True, runtime_cfg=None):
         self.orders_ref = orders_ref
+        self.runtime_cfg = runtime_cfg  # config.json runtime 섹션 (모니터 스레드 코어/우선순위)
+        self.tracer = tracer  # OrderTracer (주문 감지 시각 기록용)
+        self.poll_interval = poll_interval  # 주문 조회 주기 (초)
+        self.verbose = verbose  # False면 주문별 감지 로그 생략 (부하 테스트용)
         self.auto_detect_flag = {"enabled": False}
         self.target_order_id = None
         self.sector_id = None  # items[0].id 값 (1, 2, 3)
@@ -78,6 +109,10 @@ class FirebaseMonitor:
 
     def _monitor_loop(self):
         """주기적으로 Firebase 상태 확인"""
+        if self.runtime_cfg is not None:
+            from runtime_policy import apply_thread_policy
+            apply_thread_policy(self.runtime_cfg, "monitor")
+
         while self.monitoring:
             orders_data = self.orders_ref.get() or {}
 
@@ -104,33 +139,38 @@ class FirebaseMonitor:
                             except (ValueError, TypeError):
                                 sector_id = None
                     
-                    if not self.auto_detect_flag["enabled"]:
-                        print(f"\n{'='*60}")
-                        print(f"[AUTO DETECT ACTIVATED]")
-                        print(f"Order ID: {order_id}")
-                        print(f"Status: {status}, pose_required=True")
-                        if sector_id:
-                            print(f"Sector ID: {sector_id} (from items[0].id)")
-                        else:
-                            print(f"⚠️  Sector ID not found in items[0].id")
-                        print(f"{'='*60}\n")
+                    # 비활성 상태이거나, 이전 주문 완료 후 다음 대기 주문으로 넘어간 경우
+                    if not self.auto_detect_flag["enabled"] or order_id != self.target_order_id:
+                        if self.verbose:
+                            print(f"\n{'='*60}")
+                            print(f"[AUTO DETECT ACTIVATED]")
+                            print(f"Order ID: {order_id}")
+                            print(f"Status: {status}, pose_required=True")
+                            if sector_id:
+                                print(f"Sector ID: {sector_id} (from items[0].id)")
+                            else:
+                                print(f"⚠️  Sector ID not found in items[0].id")
+                            print(f"{'='*60}\n")
 
                         self.target_order_id = order_id
                         self.sector_id = sector_id
                         self.auto_detect_flag["enabled"] = True
+                        if self.tracer:
+                            self.tracer.mark(order_id, "appeared")
                     else:
                         # 이미 활성화된 상태에서 섹터 ID가 변경되었을 수 있음
                         if sector_id != self.sector_id:
                             self.sector_id = sector_id
-                            if sector_id:
+                            if sector_id and self.verbose:
                                 print(f"[Monitor] Sector ID updated: {sector_id}")
                     break
 
             # waiting_pose가 없으면 비활성화
             if not found_waiting and self.auto_detect_flag["enabled"]:
-                print("\n[AUTO DETECT DEACTIVATED] No waiting orders")
+                if self.verbose:
+                    print("\n[AUTO DETECT DEACTIVATED] No waiting orders")
                 self.auto_detect_flag["enabled"] = False
                 self.target_order_id = None
                 self.sector_id = None
 
-            time.sleep(0.5)
+            time.sleep(self.poll_interval)
@@ -0,0 +1,235 @@
+"""
+flight_recorder.py
+------------------------------------
+프레임별 감지 결과/처리 시간 기록 (메모리 맵 링 로그)
+- 고정 크기 파일에 NumPy 구조체 레코드를 순환 기록 (np.memmap)
+- 프레임당 레코드 1개 대입 → 기록 비용 거의 없음 (디스크 반영은 OS가 처리)
+- 픽킹 실패 시 최근 N분 기록을 잘라서 분석
+
+파일 구조:
+    [헤더 64B][레코드 × capacity]
+
+사용법:
+    python flight_recorder.py --minutes 5                  # 최근 5분 요약
+    python flight_recorder.py --minutes 5 --csv out.csv    # CSV 저장
+    python flight_recorder.py --order ORDER-212            # 특정 주문 처리 중 기록
+------------------------------------
+"""
+
+import os
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+from constants import SECTOR_ANSWERS
+
+
+MAGIC = 0x52474C46  # "FLGR"
+VERSION = 1
+HEADER_SIZE = 64
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "<u4"),
+    ("version", "<u4"),
+    ("capacity", "<u8"),
+    ("record_size", "<u4"),
+    ("reserved", "<u4"),
+    ("write_count", "<u8"),  # 누적 기록 수 (다음 기록 위치 = write_count % capacity)
+    ("created", "<f8"),
+])
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),      # 프레임 캡처 시각 (time.time())
+    ("order_hash", "<u8"),     # order_hash(order_id), 주문 없으면 0
+    ("cx", "<i4"),             # 물체 중심 픽셀 (감지 실패 시 -1)
+    ("cy", "<i4"),
+    ("angle", "<f4"),          # 최단축 각도 (deg)
+    ("distance", "<f4"),       # 추정 거리 (mm)
+    ("area", "<f4"),           # 최대 윤곽선 면적 (px²)
+    ("t_capture_ms", "<f4"),   # 프레임 읽기
+    ("t_edges_ms", "<f4"),     # 경계 검출 (blur/Canny/모폴로지)
+    ("t_contours_ms", "<f4"),  # findContours + 최대 윤곽선 선택
+    ("t_geometry_ms", "<f4"),  # 모멘트 + 최단축 계산
+    ("t_total_ms", "<f4"),     # 프레임 전체 처리
+    ("sector", "i1"),          # 섹터 ID (없거나 1~3 이외의 값이면 0)
+    ("detected", "u1"),        # 물체 감지 여부
+    ("_pad", "V6"),
+])
+
+
+def order_hash(order_id):
+    """주문 ID → 64bit 해시 (프로세스 간 동일, 0은 '주문 없음' 예약)"""
+    if not order_id:
+        return 0
+    digest = hashlib.blake2b(str(order_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+def _open_memmap(path, mode, capacity):
+    header = np.memmap(path, dtype=HEADER_DTYPE, mode=mode, offset=0, shape=(1,))
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode=mode, offset=HEADER_SIZE, shape=(capacity,))
+    return header, records
+
+
+class FlightRecorder:
+    """Vision 루프 측 기록기"""
+
+    def __init__(self, path, capacity=216000):
+        self.path = path
+        self.capacity = int(capacity)
+        size = HEADER_SIZE + RECORD_DTYPE.itemsize * self.capacity
+
+        if os.path.exists(path) and not self._compatible(path):
+            backup = path + ".old"
+            os.replace(path, backup)
+            print(f"[Recorder] Existing log has different layout, moved to {backup}")
+
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.truncate(size)
+            self.header, self.records = _open_memmap(path, "r+", self.capacity)
+            self.header[0] = (MAGIC, VERSION, self.capacity, RECORD_DTYPE.itemsize, 0, 0, time.time())
+        else:
+            self.header, self.records = _open_memmap(path, "r+", self.capacity)
+
+        self._count = int(self.header[0]["write_count"])
+        self._last_order_id = None
+        self._last_order_hash = 0
+        print(f"[Recorder] Flight log {path}: {self.capacity} records "
+              f"({size / 1e6:.1f}MB), {min(self._count, self.capacity)} existing")
+
+    def _compatible(self, path):
+        try:
+            h = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+        except Exception:
+            return False
+        return (int(h["magic"]) == MAGIC and int(h["version"]) == VERSION
+                and int(h["capacity"]) == self.capacity and int(h["record_size"]) == RECORD_DTYPE.itemsize)
+
+    def record(self, timestamp, detection=None, sector=0, order_id=None, timings=None):
+        """
+        프레임 1개 기록
+
+        Args:
+            detection: {"cx", "cy", "angle", "dist", "area"} 또는 None (감지 실패)
+            timings: {"capture", "edges", "contours", "geometry", "total"} (ms)
+        """
+        if order_id != self._last_order_id:
+            self._last_order_id = order_id
+            self._last_order_hash = order_hash(order_id)
+        t = timings or {}
+        # 주문의 items[0].id는 임의 정수일 수 있음 → 정의된 섹터 외에는 0 (i1 범위 초과 방지)
+        sector = sector if sector in SECTOR_ANSWERS else 0
+        if detection:
+            det = (detection["cx"], detection["cy"], detection["angle"], detection["dist"], detection.get("area", 0.0))
+        else:
+            det = (-1, -1, 0.0, 0.0, 0.0)
+        self.records[self._count % self.capacity] = (
+            timestamp, self._last_order_hash, *det,
+            t.get("capture", 0.0), t.get("edges", 0.0), t.get("contours", 0.0),
+            t.get("geometry", 0.0), t.get("total", 0.0),
+            sector, 1 if detection else 0, b"",
+        )
+        self._count += 1
+        # 레코드 기록 후 카운터 갱신 → 읽기 측은 완성된 레코드만 봄
+        self.header[0]["write_count"] = self._count
+
+    def flush(self):
+        self.records.flush()
+        self.header.flush()
+
+    def close(self):
+        self.flush()
+        del self.records
+        del self.header
+
+
+class FlightLogReader:
+    """사후 분석용 읽기 도구 (기록 중인 파일도 읽기 가능)"""
+
+    def __init__(self, path):
+        h = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+        if int(h["magic"]) != MAGIC or int(h["record_size"]) != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Not a flight log (or incompatible version): {path}")
+        self.path = path
+        self.capacity = int(h["capacity"])
+        self.header, self.records = _open_memmap(path, "r", self.capacity)
+
+    def all(self):
+        """전체 레코드 (시간순)"""
+        count = int(self.header[0]["write_count"])
+        if count <= self.capacity:
+            return np.array(self.records[:count])
+        start = count % self.capacity
+        return np.concatenate([self.records[start:], self.records[:start]])
+
+    def last(self, minutes=None, seconds=None, now=None):
+        """최근 N분(또는 N초) 레코드 (시간순)"""
+        window = (seconds or 0.0) + (minutes or 0.0) * 60.0
+        records = self.all()
+        if window <= 0 or len(records) == 0:
+            return records
+        end = records["timestamp"][-1] if now is None else now
+        # 시간순 정렬되어 있으므로 이진 탐색으로 시작 위치 찾기
+        start = np.searchsorted(records["timestamp"], end - window, side="left")
+        return records[start:]
+
+    def for_order(self, order_id, records=None):
+        records = self.all() if records is None else records
+        return records[records["order_hash"] == order_hash(order_id)]
+
+
+def summarize(records):
+    """레코드 요약 텍스트"""
+    if len(records) == 0:
+        return "[Recorder] No records"
+    ts = records["timestamp"]
+    detected = records[records["detected"] == 1]
+    lines = [
+        f"[Recorder] {len(records)} frames, "
+        f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts[0]))} ~ "
+        f"{time.strftime('%H:%M:%S', time.localtime(ts[-1]))} ({ts[-1] - ts[0]:.1f}s)",
+        f"  Detection rate: {len(detected) / len(records) * 100:.1f}%",
+    ]
+    if len(detected):
+        lines.append(f"  Center: cx={detected['cx'].mean():.1f}±{detected['cx'].std():.1f}, "
+                     f"cy={detected['cy'].mean():.1f}±{detected['cy'].std():.1f}, "
+                     f"angle={detected['angle'].mean():.1f}±{detected['angle'].std():.1f}deg")
+    for field in ("t_capture_ms", "t_edges_ms", "t_contours_ms", "t_geometry_ms", "t_total_ms"):
+        v = records[field]
+        lines.append(f"  {field}: mean={v.mean():.2f}, p95={np.percentile(v, 95):.2f}, max={v.max():.2f}")
+    return "\n".join(lines)
+
+
+def main():
+    from config_loader import load_config
+
+    rec_cfg = load_config().get("flight_recorder", {})
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), rec_cfg.get("path", "flight_log.bin"))
+
+    parser = argparse.ArgumentParser(description="Flight recorder 로그 분석")
+    parser.add_argument("--path", default=default_path)
+    parser.add_argument("--minutes", type=float, default=None, help="최근 N분만 (기본: 전체)")
+    parser.add_argument("--order", default=None, help="특정 주문 ID 처리 중 기록만")
+    parser.add_argument("--csv", default=None, help="CSV 저장 경로")
+    args = parser.parse_args()
+
+    reader = FlightLogReader(args.path)
+    records = reader.last(minutes=args.minutes)
+    if args.order:
+        records = reader.for_order(args.order, records)
+    print(summarize(records))
+
+    if args.csv:
+        fields = [name for name in RECORD_DTYPE.names if not name.startswith("_")]
+        with open(args.csv, "w", encoding="utf-8") as f:
+            f.write(",".join(fields) + "\n")
+            for r in records:
+                f.write(",".join(str(r[name]) for name in fields) + "\n")
+        print(f"[Recorder] Saved {len(records)} records to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+frame_bus.py
+------------------------------------
+공유 메모리 프레임 버스
+- 캡처 데몬이 카메라 프레임을 multiprocessing.shared_memory 링 버퍼에 기록
+- 여러 로컬 소비자(Vision 루프, 캘리브레이션 도구, 녹화기)가 복사 없이
+  NumPy 뷰로 프레임을 읽음
+- 헤더에 프레임 크기/채널/포맷, 슬롯 수, 최신 시퀀스 번호를 기록
+
+메모리 구조:
+    [헤더 128B][슬롯 메타데이터 (seq, timestamp) × slots][프레임 데이터 × slots]
+
+사용법:
+    python frame_bus.py serve                       # 캡처 데몬 실행 (config.json camera 설정 사용)
+    python frame_bus.py info                        # 헤더 정보 출력
+    python frame_bus.py record --out frames --every 10 --count 100   # 프레임 녹화
+------------------------------------
+"""
+
+import os
+import sys
+import time
+import argparse
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+DEFAULT_BUS_NAME = "robot_arm_frames"
+DEFAULT_SLOTS = 8
+
+MAGIC = 0x53554246  # "FBUS"
+VERSION = 1
+HEADER_SIZE = 128
+STALE_SEC = 5.0  # heartbeat가 이보다 오래되면 데몬이 멈춘 것으로 판단
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "<u4"),
+    ("version", "<u4"),
+    ("width", "<u4"),
+    ("height", "<u4"),
+    ("channels", "<u4"),
+    ("slots", "<u4"),
+    ("frame_bytes", "<u8"),
+    ("latest_seq", "<u8"),     # 마지막으로 완성된 프레임 시퀀스 번호 (1부터, 0이면 없음)
+    ("heartbeat", "<f8"),      # 데몬이 마지막으로 프레임을 기록한 시각
+    ("fps", "<f8"),            # 데몬 측 측정 FPS
+    ("writer_pid", "<u4"),
+    ("dtype", "S8"),           # NumPy dtype 문자열 (예: "|u1")
+    ("pixel_format", "S8"),    # "BGR", "GRAY" 등
+])
+
+SLOT_DTYPE = np.dtype([
+    ("seq", "<u8"),            # 0이면 기록 중 (읽기 불가)
+    ("timestamp", "<f8"),      # 캡처 시각 (time.time())
+])
+
+
+def _attach(name):
+    """기존 공유 메모리에 연결 (소비자 종료 시 세그먼트가 삭제되지 않도록 추적 해제)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # 3.12 이하: resource_tracker가 소비자 종료 시 unlink하는 문제 방지
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _pid_alive(pid):
+    """POSIX 전용 프로세스 생존 확인 (Windows의 os.kill은 프로세스를 종료시키므로 사용 안함)"""
+    if os.name != "posix" or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # 다른 사용자 프로세스
+    return True
+
+
+def _live_writer(shm):
+    """기존 세그먼트를 실행 중인 데몬이 쓰고 있으면 (pid, heartbeat 경과 초), 아니면 None"""
+    if shm.size < HEADER_SIZE:
+        return None
+    header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf, offset=0)[0]
+    magic, pid, heartbeat = int(header["magic"]), int(header["writer_pid"]), float(header["heartbeat"])
+    del header
+    if magic != MAGIC:
+        return None
+    age = time.time() - heartbeat
+    if age < STALE_SEC or (pid != os.getpid() and _pid_alive(pid)):
+        return pid, age
+    return None
+
+
+class _FrameBusLayout:
+    """공유 메모리 버퍼 위의 헤더/슬롯/프레임 NumPy 뷰"""
+
+    def __init__(self, buf):
+        self.header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=buf, offset=0)[0]
+        h = self.header
+        self.width = int(h["width"])
+        self.height = int(h["height"])
+        self.channels = int(h["channels"])
+        self.num_slots = int(h["slots"])
+        self.frame_bytes = int(h["frame_bytes"])
+        self.dtype = np.dtype(h["dtype"].decode())
+        self.pixel_format = h["pixel_format"].decode()
+
+        shape = (self.height, self.width, self.channels) if self.channels > 1 else (self.height, self.width)
+        slot_offset = HEADER_SIZE
+        data_offset = slot_offset + SLOT_DTYPE.itemsize * self.num_slots
+        self.slots = np.ndarray((self.num_slots,), dtype=SLOT_DTYPE, buffer=buf, offset=slot_offset)
+        self.frames = [
+            np.ndarray(shape, dtype=self.dtype, buffer=buf, offset=data_offset + i * self.frame_bytes)
+            for i in range(self.num_slots)
+        ]
+
+    @staticmethod
+    def total_size(frame_bytes, slots):
+        return HEADER_SIZE + SLOT_DTYPE.itemsize * slots + frame_bytes * slots
+
+
+class FrameBusWriter:
+    """캡처 데몬 측: 공유 메모리 생성 및 프레임 기록"""
+
+    def __init__(self, name, width, height, channels=3, dtype=np.uint8, slots=DEFAULT_SLOTS, pixel_format="BGR"):
+        dtype = np.dtype(dtype)
+        frame_bytes = width * height * channels * dtype.itemsize
+        size = _FrameBusLayout.total_size(frame_bytes, slots)
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 다른 데몬이 실행 중이면 거부 (unlink하면 실행 중인 데몬이 고아 세그먼트에 계속 기록)
+            # 확인용 연결은 _attach 사용 - resource_tracker에 등록되면 이 프로세스 종료 시 데몬의 버스가 삭제됨
+            existing = _attach(name)
+            live = _live_writer(existing)
+            existing.close()
+            if live:
+                pid, age = live
+                raise RuntimeError(f"Frame bus '{name}' is in use by capture daemon (pid {pid}, "
+                                   f"last frame {age:.1f}s ago)")
+            # 이전 데몬이 비정상 종료하여 남은 세그먼트 정리 후 재생성
+            # (일반 연결 후 unlink - resource_tracker 등록/해제가 짝을 이룸)
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=self.shm.buf, offset=0)
+        header[0] = (0, VERSION, width, height, channels, slots, frame_bytes, 0, 0.0, 0.0,
+                     os.getpid(), dtype.str.encode(), pixel_format.encode())
+        del header
+        self.layout = _FrameBusLayout(self.shm.buf)
+        self.layout.slots[:] = (0, 0.0)
+        self.layout.header["magic"] = MAGIC  # 헤더 작성 완료 후 마지막에 기록
+        self.name = name
+        self.seq = 0
+        print(f"[FrameBus] Created '{name}': {width}x{height}x{channels} {pixel_format}, "
+              f"{slots} slots, {size / 1e6:.1f}MB")
+
+    def write(self, frame, timestamp=None):
+        """프레임 기록 후 시퀀스 번호 반환"""
+        self.seq += 1
+        layout = self.layout
+        slot = self.seq % layout.num_slots
+        meta = layout.slots[slot]
+        meta["seq"] = 0  # 기록 중 표시
+        np.copyto(layout.frames[slot], frame.reshape(layout.frames[slot].shape))
+        meta["timestamp"] = time.time() if timestamp is None else timestamp
+        meta["seq"] = self.seq
+        layout.header["latest_seq"] = self.seq
+        layout.header["heartbeat"] = time.time()
+        return self.seq
+
+    def set_fps(self, fps):
+        self.layout.header["fps"] = fps
+
+    def close(self):
+        self.layout.header["magic"] = 0
+        del self.layout
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # 외부에서 프레임 뷰를 잡고 있는 경우 - 프로세스 종료 시 해제됨
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            print(f"[FrameBus] ⚠️  '{self.name}' was already removed")
+        print(f"[FrameBus] Closed '{self.name}'")
+
+
+class FrameBusReader:
+    """
+    소비자 측: 공유 메모리 프레임 읽기 (복사 없는 NumPy 뷰)
+
+    - read(): 새 프레임을 기다렸다가 (ok, frame_view) 반환 - cv2.VideoCapture.read()와 호환
+    - 반환된 뷰는 데몬이 링 버퍼를 한 바퀴 돌 때까지(slots - 1 프레임) 유효
+      필요하면 is_valid(seq)로 확인하거나 복사해서 사용
+    """
+
+    def __init__(self, name=DEFAULT_BUS_NAME, timeout=2.0):
+        self.name = name
+        self.timeout = timeout
+        self.last_seq = 0
+        self.last_timestamp = 0.0
+        self.dropped = 0
+        try:
+            self.shm = _attach(name)
+        except FileNotFoundError:
+            print(f"[ERROR] Frame bus '{name}' not found. 캡처 데몬(python frame_bus.py serve)을 먼저 실행하세요.")
+            self.shm = None
+            self.layout = None
+            return
+        self.layout = _FrameBusLayout(self.shm.buf)
+        if int(self.layout.header["magic"]) != MAGIC:
+            print(f"[ERROR] Frame bus '{name}' header invalid")
+        else:
+            print(f"[FrameBus] Attached '{name}': {self.layout.width}x{self.layout.height}x"
+                  f"{self.layout.channels} {self.layout.pixel_format}, {self.layout.num_slots} slots")
+
+    def isOpened(self):
+        return self.layout is not None and int(self.layout.header["magic"]) == MAGIC
+
+    def latest(self):
+        """가장 최근 프레임 (seq, timestamp, frame_view). 없으면 (0, 0.0, None)"""
+        layout = self.layout
+        seq = int(layout.header["latest_seq"])
+        if seq == 0:
+            return 0, 0.0, None
+        meta = layout.slots[seq % layout.num_slots]
+        timestamp = float(meta["timestamp"])
+        if int(meta["seq"]) != seq:
+            # 읽는 사이 덮어쓰기 시작됨 (데몬이 링을 한 바퀴 돈 경우)
+            return 0, 0.0, None
+        return seq, timestamp, layout.frames[seq % layout.num_slots]
+
+    def is_valid(self, seq):
+        """seq 프레임 뷰가 아직 덮어쓰이지 않았는지 확인"""
+        return int(self.layout.slots[seq % self.layout.num_slots]["seq"]) == seq
+
+    def read(self):
+        """새 프레임이 올 때까지 대기 후 (ok, frame_view) 반환"""
+        if not self.isOpened():
+            return False, None
+        deadline = time.time() + self.timeout
+        while True:
+            seq, timestamp, frame = self.latest()
+            if frame is not None and seq > self.last_seq:
+                if self.last_seq:
+                    self.dropped += seq - self.last_seq - 1
+                self.last_seq = seq
+                self.last_timestamp = timestamp
+                return True, frame
+            if time.time() > deadline:
+                print(f"[FrameBus] No new frame within {self.timeout:.1f}s (daemon stopped?)")
+                return False, None
+            time.sleep(0.001)
+
+    def get(self, prop_id):
+        """cv2.VideoCapture.get() 호환 (해상도/FPS만 지원)"""
+        import cv2
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.layout.width)
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.layout.height)
+        if prop_id == cv2.CAP_PROP_FPS:
+            return float(self.layout.header["fps"])
+        return 0.0
+
+    def set(self, prop_id, value):
+        # 카메라 설정은 캡처 데몬에서만 변경 가능
+        return False
+
+    def release(self):
+        if self.shm is not None:
+            self.layout = None
+            try:
+                self.shm.close()
+            except BufferError:
+                pass  # 호출자가 프레임 뷰를 잡고 있는 경우 - 프로세스 종료 시 해제됨
+            self.shm = None
+
+
+def serve(config, slots):
+    """캡처 데몬: 카메라 → 공유 메모리"""
+    from camera_capture import open_capture
+
+    cam_cfg = config["camera"]
+    bus_cfg = cam_cfg.get("frame_bus", {})
+    name = bus_cfg.get("name", DEFAULT_BUS_NAME)
+
+    cap = open_capture(cam_cfg)
+    if not cap.isOpened():
+        print("[ERROR] 카메라를 열 수 없습니다.")
+        return
+    ok, frame = cap.read()
+    if not ok:
+        print("[ERROR] 카메라 프레임을 읽을 수 없습니다.")
+        cap.release()
+        return
+
+    H, W = frame.shape[:2]
+    channels = frame.shape[2] if frame.ndim == 3 else 1
+    try:
+        writer = FrameBusWriter(name, W, H, channels, frame.dtype, slots=slots or bus_cfg.get("slots", DEFAULT_SLOTS),
+                                pixel_format="BGR" if channels == 3 else "GRAY")
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        cap.release()
+        return
+    print("[FrameBus] Capture daemon running (Ctrl+C 종료)")
+
+    count = 0
+    window_start = time.time()
+    try:
+        while ok:
+            writer.write(frame, time.time())
+            count += 1
+            now = time.time()
+            if now - window_start >= 1.0:
+                writer.set_fps(count / (now - window_start))
+                count = 0
+                window_start = now
+            ok, frame = cap.read()
+        print("[ERROR] 카메라 프레임을 읽을 수 없습니다.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        writer.close()
+
+
+def record(name, out_dir, every, count):
+    """녹화기: 프레임 버스에서 N프레임마다 PNG 저장"""
+    import cv2
+
+    reader = FrameBusReader(name)
+    if not reader.isOpened():
+        return
+    os.makedirs(out_dir, exist_ok=True)
+    saved = 0
+    index = 0
+    try:
+        while saved < count:
+            ok, frame = reader.read()
+            if not ok:
+                break
+            index += 1
+            if index % every:
+                continue
+            path = os.path.join(out_dir, f"frame_{reader.last_seq:08d}.png")
+            cv2.imwrite(path, frame)
+            saved += 1
+    except KeyboardInterrupt:
+        pass
+    print(f"[FrameBus] Recorded {saved} frames to {out_dir} (dropped {reader.dropped})")
+    reader.release()
+
+
+def main():
+    from config_loader import load_config
+
+    parser = argparse.ArgumentParser(description="공유 메모리 프레임 버스")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_serve = sub.add_parser("serve", help="캡처 데몬 실행")
+    p_serve.add_argument("--slots", type=int, default=0, help="링 버퍼 슬롯 수 (기본: config 값)")
+    sub.add_parser("info", help="헤더 정보 출력")
+    p_rec = sub.add_parser("record", help="프레임 녹화")
+    p_rec.add_argument("--out", default="recordings")
+    p_rec.add_argument("--every", type=int, default=1, help="N프레임마다 저장")
+    p_rec.add_argument("--count", type=int, default=100)
+    args = parser.parse_args()
+
+    config = load_config()
+    name = config["camera"].get("frame_bus", {}).get("name", DEFAULT_BUS_NAME)
+
+    if args.command == "serve":
+        serve(config, args.slots)
+    elif args.command == "info":
+        reader = FrameBusReader(name)
+        if not reader.isOpened():
+            sys.exit(1)
+        h = reader.layout.header
+        print(f"  Geometry: {reader.layout.width}x{reader.layout.height}x{reader.layout.channels} "
+              f"({reader.layout.dtype}, {reader.layout.pixel_format})")
+        print(f"  Slots: {reader.layout.num_slots}, latest seq: {int(h['latest_seq'])}, fps: {float(h['fps']):.1f}")
+        print(f"  Writer PID: {int(h['writer_pid'])}, last frame {time.time() - float(h['heartbeat']):.2f}s ago")
+        reader.release()
+    elif args.command == "record":
+        record(name, args.out, max(1, args.every), args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+frame_dataset.py
+------------------------------------
+녹화 프레임 데이터셋 로더
+- frame_bus.py record로 저장한 이미지 폴더 구조 사용
+    recordings/
+      sector1/frame_00000010.png ...
+      sector2/...
+- 하위 폴더 하나 = 같은 장면(물체 위치 고정)을 찍은 프레임 그룹
+------------------------------------
+"""
+
+import os
+
+import cv2
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def find_frame_groups(root):
+    """{그룹 이름: [이미지 경로, ...]} (root 바로 아래 이미지는 그룹 '.')"""
+    groups = {}
+    for dirpath, _, filenames in os.walk(root):
+        files = sorted(f for f in filenames if f.lower().endswith(IMAGE_EXTENSIONS))
+        if files:
+            name = os.path.relpath(dirpath, root).replace("\\", "/")
+            groups[name] = [os.path.join(dirpath, f) for f in files]
+    return dict(sorted(groups.items()))
+
+
+def load_frame_groups(root, limit=None):
+    """{그룹 이름: [BGR 프레임, ...]} (그룹당 최대 limit장)"""
+    frames = {}
+    for name, paths in find_frame_groups(root).items():
+        images = []
+        for path in paths[:limit]:
+            image = cv2.imread(path)
+            if image is None:
+                print(f"[Dataset] ⚠️  Cannot read {path}")
+                continue
+            images.append(image)
+        if images:
+            frames[name] = images
+    return frames
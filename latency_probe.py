@@ -0,0 +1,166 @@
+"""
+latency_probe.py
+------------------------------------
+캡처 → 감지 지연시간 측정 도구 (glass-to-detection)
+- 화면에 검정/흰색 자극을 번갈아 표시하고 시각 기록
+- 카메라가 그 화면을 촬영한 프레임을 VisionEngine으로 처리 완료한 시각까지 측정
+  → 카메라 노출 + 드라이버 버퍼 + 전송 + 처리 지연 합계 (모니터 표시 지연 포함)
+- 캡처 프로파일(camera.capture_profiles)별로 비교하여 가장 빠른 프로파일 선택
+
+사용법:
+    1. 카메라가 모니터 화면(자극 창)을 보도록 배치
+    2. python latency_probe.py                       # 현재 capture_profile 측정
+       python latency_probe.py --profile all         # 모든 프로파일 비교
+       python latency_probe.py --profile mjpg_low_latency --trials 30
+------------------------------------
+"""
+
+import time
+import random
+import argparse
+
+import cv2
+import numpy as np
+
+from config_loader import load_config
+from camera_capture import open_capture, get_capture_profile
+from vision_engine import VisionEngine
+
+
+WINDOW = "Latency Probe Stimulus"
+
+
+def _show(level, size):
+    cv2.imshow(WINDOW, np.full(size, level, dtype=np.uint8))
+    cv2.waitKey(1)  # 창 갱신
+    return time.perf_counter()
+
+
+def _roi_brightness(frame, roi):
+    H, W = frame.shape[:2]
+    x0, x1 = int(W * (0.5 - roi / 2)), int(W * (0.5 + roi / 2))
+    y0, y1 = int(H * (0.5 - roi / 2)), int(H * (0.5 + roi / 2))
+    return float(frame[y0:y1, x0:x1].mean())
+
+
+def probe_profile(config, profile_name, trials, roi, stimulus_size, timeout=2.0):
+    """프로파일 1개 측정 → 지연시간 목록(ms)과 캡처 FPS"""
+    cam_cfg = config["camera"]
+    cap = open_capture(cam_cfg, profile_name)
+    if not cap.isOpened():
+        print(f"[Probe] ⚠️  Cannot open camera with profile '{profile_name}'")
+        return [], 0.0
+    engine = VisionEngine(config)
+
+    def read_processed():
+        ok, frame = cap.read()
+        if not ok:
+            return None, None
+        engine.process_frame(frame, keep_edges=False)  # 실제 감지 처리까지 포함
+        return _roi_brightness(frame, roi), time.perf_counter()
+
+    # 1️⃣ 검정/흰색 밝기 기준 측정 (자동 노출 안정화 대기 포함)
+    levels = {}
+    for level in (0, 255):
+        _show(level, stimulus_size)
+        end = time.perf_counter() + 1.5
+        samples = []
+        while time.perf_counter() < end:
+            b, _ = read_processed()
+            if b is not None:
+                samples.append(b)
+        levels[level] = float(np.median(samples[-10:])) if samples else 0.0
+    threshold = (levels[0] + levels[255]) / 2.0
+    print(f"[Probe] ROI brightness: black={levels[0]:.1f}, white={levels[255]:.1f}, threshold={threshold:.1f}")
+    if abs(levels[255] - levels[0]) < 20:
+        print("[Probe] ⚠️  Contrast too low - 카메라가 자극 창을 보고 있는지 확인하세요")
+        cap.release()
+        engine.close()
+        return [], 0.0
+
+    # 2️⃣ 자극 전환 → 감지까지 시간 측정
+    latencies = []
+    frame_count = 0
+    start = time.perf_counter()
+    level = 255
+    for i in range(trials * 2):
+        # 다음 전환 전 임의 대기 (카메라 주기와 동기화되지 않도록), 대기 중에도 계속 프레임 소비
+        wait_end = time.perf_counter() + random.uniform(0.2, 0.5)
+        while time.perf_counter() < wait_end:
+            if read_processed()[0] is not None:
+                frame_count += 1
+
+        level = 0 if level == 255 else 255
+        t_flip = _show(level, stimulus_size)
+        deadline = t_flip + timeout
+        while time.perf_counter() < deadline:
+            b, t_done = read_processed()
+            if b is None:
+                continue
+            frame_count += 1
+            if (level == 255 and b > threshold) or (level == 0 and b < threshold):
+                latencies.append((t_done - t_flip) * 1000.0)
+                break
+        else:
+            print(f"[Probe] Trial {i + 1}: no transition detected within {timeout:.1f}s")
+
+    fps = frame_count / (time.perf_counter() - start)
+    cap.release()
+    engine.close()
+    return latencies, fps
+
+
+def main():
+    config = load_config()
+    cam_cfg = config["camera"]
+
+    parser = argparse.ArgumentParser(description="캡처 → 감지 지연시간 측정")
+    parser.add_argument("--profile", default=None, help="프로파일 이름 (all: 전체 비교, 기본: camera.capture_profile)")
+    parser.add_argument("--trials", type=int, default=20, help="프로파일별 측정 횟수 (검정→흰색, 흰색→검정 각각)")
+    parser.add_argument("--roi", type=float, default=0.5, help="밝기 측정 영역 (프레임 중앙 비율)")
+    args = parser.parse_args()
+
+    if args.profile == "all":
+        names = list(cam_cfg.get("capture_profiles", {}).keys())
+    else:
+        names = [get_capture_profile(cam_cfg, args.profile)[0]]
+
+    print("=" * 80)
+    print("⏱️  캡처 → 감지 지연시간 측정")
+    print("=" * 80)
+    print(f"[설정] 프로파일: {', '.join(names)}, 측정 횟수: {args.trials} × 2")
+    print("카메라가 자극 창(전체 화면)을 보도록 배치하세요.\n")
+
+    cv2.namedWindow(WINDOW, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(WINDOW, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+    stimulus_size = (480, 640)
+
+    results = {}
+    for name in names:
+        print(f"\n[Probe] Profile '{name}'")
+        latencies, fps = probe_profile(config, name, args.trials, args.roi, stimulus_size)
+        results[name] = (latencies, fps)
+
+    cv2.destroyAllWindows()
+
+    print("\n" + "=" * 80)
+    print(f"{'Profile':<20}{'FPS':>8}{'n':>5}{'mean':>10}{'p50':>10}{'p95':>10}{'min':>10}  (ms)")
+    best = None
+    for name, (latencies, fps) in results.items():
+        if not latencies:
+            print(f"{name:<20}{fps:>8.1f}{0:>5}  (no samples)")
+            continue
+        arr = np.asarray(latencies)
+        p50 = float(np.percentile(arr, 50))
+        print(f"{name:<20}{fps:>8.1f}{len(arr):>5}{arr.mean():>10.1f}{p50:>10.1f}"
+              f"{np.percentile(arr, 95):>10.1f}{arr.min():>10.1f}")
+        if best is None or p50 < best[1]:
+            best = (name, p50)
+    print("=" * 80)
+    if best:
+        print(f"[Probe] Fastest profile: '{best[0]}' (p50 {best[1]:.1f}ms) → config.json camera.capture_profile")
+    print("※ 측정값에는 모니터 표시 지연(보통 10~30ms)이 포함됩니다. 프로파일 간 비교용으로 사용하세요.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+load_generator.py
+------------------------------------
+주문 트래픽 부하 생성 도구
+- 로컬 인메모리 주문 저장소(LocalOrderStore)에 대량의 과거 주문 시딩
+- waiting_pose 주문을 지정한 도착 패턴(constant / poisson / burst)으로 생성
+- FirebaseMonitor + send_to_firebase 경로를 그대로 사용하여 측정
+  · 감지 지연 (주문 생성 → 모니터 감지)
+  · 초당 Pose 전송 수
+  · 모니터/전송 측 CPU 사용량
+  · 메모리 증가량 (프로세스 RSS, tracemalloc은 get() 복사 속도를 늦춰 지연 측정을 왜곡하므로 사용 안함)
+
+사용법:
+    python load_generator.py --history 50000 --pattern burst --burst-size 20
+    python load_generator.py --pattern poisson --rate 2 --orders 200
+------------------------------------
+"""
+
+import sys
+import time
+import random
+import argparse
+import threading
+
+import numpy as np
+
+from config_loader import load_config
+from constants import SECTOR_ANSWERS
+from firebase_manager import FirebaseMonitor, send_to_firebase
+from order_store import LocalOrderStore
+from order_trace import OrderTracer
+
+
+def _memory_usage():
+    """프로세스 메모리 (현재 RSS, 최대 RSS) bytes, 측정 불가 시 (None, None)"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/status") as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+            return int(status["VmRSS"].split()[0]) * 1024, int(status["VmHWM"].split()[0]) * 1024
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            psapi = ctypes.WinDLL("psapi")
+            psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+            if psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize, counters.PeakWorkingSetSize
+        else:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # macOS: bytes
+            return peak, peak
+    except (OSError, KeyError, ValueError, AttributeError):
+        pass
+    return None, None
+
+
+def _mb(value):
+    return f"{value / 1e6:.1f}MB" if value is not None else "n/a"
+
+
+def _growth_mb(value, baseline):
+    return f"+{(value - baseline) / 1e6:.1f}MB" if value is not None and baseline is not None else "n/a"
+
+
+class _MeasuredStore:
+    """
+    주문 저장소 래퍼 - get() 호출 스레드(모니터 스레드)의 누적 CPU 시간 기록
+    (time.thread_time()은 호출한 스레드 기준이므로 모니터 스레드 안에서 샘플링)
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.get_count = 0
+        self.get_time_total = 0.0
+        self.monitor_cpu = 0.0
+
+    def get(self):
+        start = time.perf_counter()
+        data = self.store.get()
+        self.get_time_total += time.perf_counter() - start
+        self.get_count += 1
+        self.monitor_cpu = time.thread_time()
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.store, name)
+
+
+def seed_history(count, sectors):
+    """완료 상태의 과거 주문 생성"""
+    now = time.time()
+    history = {}
+    for i in range(count):
+        sector_id = random.choice(sectors)
+        history[f"ORDER-HIST-{i:06d}"] = {
+            "status": "done",
+            "pose_required": False,
+            "items": [{"id": str(sector_id), "qty": 1}],
+            "pose": {"type": "coords", "values": list(SECTOR_ANSWERS.get(sector_id, [0.0] * 6))},
+            "created_at": now - (count - i),
+        }
+    return history
+
+
+def arrival_offsets(pattern, count, rate, burst_size, burst_interval):
+    """주문 도착 시각 오프셋(초) 목록"""
+    if pattern == "constant":
+        return [i / rate for i in range(count)]
+    if pattern == "poisson":
+        gaps = np.random.exponential(1.0 / rate, size=count)
+        return np.cumsum(gaps).tolist()
+    if pattern == "burst":
+        return [(i // burst_size) * burst_interval for i in range(count)]
+    raise ValueError(f"Unknown arrival pattern: {pattern}")
+
+
+def main():
+    config = load_config()
+    auto_cfg = config.get("auto_send", {})
+
+    parser = argparse.ArgumentParser(description="FirebaseMonitor / send_to_firebase 부하 테스트")
+    parser.add_argument("--history", type=int, default=20000, help="시딩할 과거 주문 수")
+    parser.add_argument("--orders", type=int, default=100, help="생성할 waiting_pose 주문 수")
+    parser.add_argument("--pattern", choices=["constant", "poisson", "burst"], default="constant")
+    parser.add_argument("--rate", type=float, default=1.0, help="constant/poisson 도착률 (주문/초)")
+    parser.add_argument("--burst-size", type=int, default=10, help="burst 패턴의 한 번에 도착하는 주문 수")
+    parser.add_argument("--burst-interval", type=float, default=10.0, help="burst 간격 (초)")
+    parser.add_argument("--sectors", default="1,2,3", help="items[0].id로 사용할 섹터 ID 목록")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="FirebaseMonitor 조회 주기 (초)")
+    parser.add_argument("--send-interval", type=float, default=auto_cfg.get("send_interval_sec", 1.0),
+                        help="같은 주문 재전송 간격 (초, 기본: config auto_send.send_interval_sec)")
+    parser.add_argument("--frame-rate", type=float, default=30.0, help="전송 측 루프 주기 (Vision 루프 FPS 모사)")
+    parser.add_argument("--robot-delay", type=float, default=0.0, help="Pose 수신 후 로봇이 주문을 완료하기까지 지연 (초)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="최대 실행 시간 (초)")
+    parser.add_argument("--report", default=None, help="트레이스 JSON 저장 경로")
+    args = parser.parse_args()
+
+    sectors = [int(s) for s in args.sectors.split(",") if s.strip()]
+
+    print("=" * 80)
+    print("📈 주문 트래픽 부하 생성 도구")
+    print("=" * 80)
+    print(f"[설정] 과거 주문: {args.history}, 대기 주문: {args.orders}, 패턴: {args.pattern}")
+    print(f"[설정] 모니터 주기: {args.poll_interval}s, 전송 간격: {args.send_interval}s, 섹터: {sectors}")
+    print("")
+
+    # 1️⃣ 과거 주문 시딩
+    seed_start = time.perf_counter()
+    store = LocalOrderStore(initial_data=seed_history(args.history, sectors))
+    print(f"[Seed] {args.history} historical orders in {time.perf_counter() - seed_start:.2f}s")
+    mem_baseline, _ = _memory_usage()
+
+    # 2️⃣ 로봇 측 모사: Pose가 기록되면 주문 완료 처리
+    def on_event(event):
+        if event.event_type == "patch" and isinstance(event.data, dict) and "pose" in event.data:
+            order_id = event.path.strip("/")
+            if args.robot_delay > 0:
+                time.sleep(args.robot_delay)
+            store.update(order_id, {"status": "done", "pose_required": False})
+
+    registration = store.listen(on_event)
+
+    # 3️⃣ 모니터 시작
+    measured = _MeasuredStore(store)
+    tracer = OrderTracer()
+    monitor = FirebaseMonitor(measured, tracer=tracer, poll_interval=args.poll_interval, verbose=False)
+    monitor.start_monitoring()
+
+    # 4️⃣ 주문 생성 스레드
+    created_at = {}
+    offsets = arrival_offsets(args.pattern, args.orders, args.rate, args.burst_size, args.burst_interval)
+
+    def generate():
+        start = time.time()
+        for i, offset in enumerate(offsets):
+            delay = start + offset - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            order_id = f"ORDER-LOAD-{i:06d}"
+            created_at[order_id] = time.time()
+            store.set(order_id, {
+                "status": "waiting_pose",
+                "pose_required": True,
+                "items": [{"id": str(random.choice(sectors)), "qty": 1}],
+                "created_at": created_at[order_id],
+            })
+
+    generator = threading.Thread(target=generate, daemon=True)
+    generator.start()
+
+    # 5️⃣ 전송 측: run_vision_loop의 자동 전송 분기와 동일한 판단 (테스트 모드 좌표)
+    run_start = time.time()
+    cpu_start = time.process_time()
+    sender_cpu_start = time.thread_time()
+    last_send_time = 0
+    sent = 0
+    frame_period = 1.0 / args.frame_rate
+    mem_samples = []
+    next_report = run_start + 5.0
+
+    while time.time() - run_start < args.timeout:
+        now = time.time()
+        if monitor.auto_detect_flag["enabled"] and now - last_send_time > args.send_interval:
+            order_id = monitor.target_order_id
+            sector_id = monitor.sector_id
+            if order_id and sector_id in SECTOR_ANSWERS:
+                send_to_firebase(store, order_id, *SECTOR_ANSWERS[sector_id], verbose=False)
+                tracer.mark(order_id, "pose_written")
+                last_send_time = now
+                sent += 1
+
+        if now >= next_report:
+            current, _ = _memory_usage()
+            mem_samples.append(current)
+            # 생성 스레드가 created_at에 계속 추가하므로 복사본으로 순회
+            created = list(created_at)
+            done = sum(1 for oid in created if tracer.has_mark(oid, "pose_written"))
+            print(f"[Load] t={now - run_start:6.1f}s created={len(created)} posed={done} "
+                  f"polls={measured.get_count} mem={_growth_mb(current, mem_baseline)}")
+            next_report = now + 5.0
+
+        if not generator.is_alive() and all(tracer.has_mark(oid, "pose_written") for oid in list(created_at)):
+            break
+        time.sleep(frame_period)
+
+    elapsed = time.time() - run_start
+    cpu_total = time.process_time() - cpu_start
+    sender_cpu = time.thread_time() - sender_cpu_start
+    monitor.stop_monitoring()
+    registration.close()
+    mem_end, mem_peak = _memory_usage()
+
+    # 6️⃣ 결과 (시간 초과 시 생성 스레드가 아직 실행 중일 수 있으므로 복사본 사용)
+    created = dict(created_at)
+    traces = tracer.traces()
+    lags = [(traces[oid]["appeared"] - ts) * 1000.0 for oid, ts in created.items() if "appeared" in traces.get(oid, {})]
+    e2e = [(traces[oid]["pose_written"] - ts) * 1000.0 for oid, ts in created.items() if "pose_written" in traces.get(oid, {})]
+    posed = len(e2e)
+
+    print("")
+    print("=" * 80)
+    print("[Result]")
+    print(f"  Duration: {elapsed:.1f}s, orders created: {len(created)}, posed: {posed}, pose writes: {sent}")
+    print(f"  Poses/sec: {posed / elapsed:.2f}" if elapsed > 0 else "  Poses/sec: n/a")
+    for name, values in (("Detection lag", lags), ("Created → pose", e2e)):
+        if values:
+            arr = np.asarray(values)
+            print(f"  {name}: mean={arr.mean():.1f}ms, p50={np.percentile(arr, 50):.1f}ms, "
+                  f"p95={np.percentile(arr, 95):.1f}ms, max={arr.max():.1f}ms")
+        else:
+            print(f"  {name}: (no samples)")
+    if measured.get_count:
+        print(f"  Monitor polls: {measured.get_count}, mean get(): {measured.get_time_total / measured.get_count * 1000:.1f}ms")
+    print(f"  CPU: process {cpu_total / elapsed * 100:.1f}%, monitor thread {measured.monitor_cpu / elapsed * 100:.1f}%, "
+          f"sender thread {sender_cpu / elapsed * 100:.1f}%")
+    print(f"  Memory (RSS): baseline {_mb(mem_baseline)}, growth {_growth_mb(mem_end, mem_baseline)}, "
+          f"peak {_mb(mem_peak)}")
+    if mem_samples and mem_baseline is not None:
+        print("  Memory samples (MB over baseline): "
+              + ", ".join(f"{(m - mem_baseline) / 1e6:.1f}" for m in mem_samples))
+    print("=" * 80)
+
+    if args.report:
+        tracer.save(args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,21 +3,25 @@ main.py
 ------------------------------------
 프로그램 진입점 (myproject - 영상 기반 좌표 전송)
 - 설정 로드
-- Firebase 초기화 및 모니터링 시작
+- 주문 저장소(Firebase/로컬) 초기화 및 모니터링 시작
 - Vision 루프 실행
+- 종료 시 주문별 지연시간 리포트 출력
 
 사용법:
     python main.py          # config.json의 mode.test_mode 설정에 따라 실행 모드 결정
 ------------------------------------
 """
 
+import os
 import sys
 import time
 from datetime import datetime
 
 # 내부 모듈 임포트
 from config_loader import load_config
-from firebase_manager import init_firebase, FirebaseMonitor
+from firebase_manager import init_order_store, FirebaseMonitor
+from order_trace import OrderTracer
+from runtime_policy import apply_opencv_threads, apply_thread_policy
 from vision_processor import run_vision_loop
 
 
@@ -43,24 +47,36 @@ def main():
     print(f"[Mode] {'테스트 모드 (Sector ID 기반)' if test_mode else '실제 모드 (영상 계산)'} (config.json에서 설정)")
     print(f"[Config] 카메라 번호: {cam_cfg.get('camera_number', 0)}")
     print(f"[Config] 자동 전송 모드: {auto_cfg.get('active_spacebar', False)}")
+
+    # OpenCV 스레드 수 (runtime 섹션)
+    runtime_cfg = config.get('runtime', {})
+    apply_opencv_threads(runtime_cfg)
     print("")
 
-    # 2️⃣ Firebase 초기화
+    # 2️⃣ 주문 저장소 초기화 (order_store.backend: firebase / local)
     try:
-        orders_ref = init_firebase()
+        orders_ref = init_order_store(config)
     except Exception as e:
-        print(f"[ERROR] Firebase 초기화 실패: {e}")
+        backend = config.get('order_store', {}).get('backend', 'firebase')
+        print(f"[ERROR] 주문 저장소 초기화 실패 (backend: {backend}): {e}")
         sys.exit(1)
 
+    # 주문별 지연시간 추적 (tracing.enabled)
+    trace_cfg = config.get('tracing', {})
+    tracer = OrderTracer(trace_cfg.get('histogram_bins_ms')) if trace_cfg.get('enabled', False) else None
+
     # 3️⃣ Firebase 모니터 시작 (자동 모드일 때만)
     monitor = None
     if not auto_cfg.get('active_spacebar', False):
-        monitor = FirebaseMonitor(orders_ref)
+        monitor = FirebaseMonitor(orders_ref, tracer=tracer, runtime_cfg=runtime_cfg)
         monitor.start_monitoring()
 
     # 4️⃣ Vision 루프 실행
+    # 메인(캡처/감지) 스레드 코어 고정은 저장소/모니터 스레드를 만든 뒤에 적용
+    # (새 스레드는 만든 스레드의 코어 설정을 물려받으므로 Firebase SDK/모니터 스레드가 vision 코어에 묶이지 않도록)
+    apply_thread_policy(runtime_cfg, "vision")
     try:
-        run_vision_loop(config, orders_ref, monitor, test_mode=test_mode)
+        run_vision_loop(config, orders_ref, monitor, test_mode=test_mode, tracer=tracer)
     except KeyboardInterrupt:
         print("\n[INFO] 사용자 인터럽트로 종료")
     except Exception as e:
@@ -69,6 +85,11 @@ def main():
         # 안전한 종료 처리
         if monitor:
             monitor.stop_monitoring()
+        if tracer:
+            print(tracer.report())
+            report_file = trace_cfg.get('report_file')
+            if report_file:
+                tracer.save(os.path.join(os.path.dirname(os.path.abspath(__file__)), report_file))
         print("\n프로그램을 종료합니다.")
         time.sleep(0.5)
 
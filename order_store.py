@@ -0,0 +1,182 @@
+"""
+order_store.py
+------------------------------------
+주문 저장소 인터페이스 모듈
+- OrderStore: get / update / listen 공통 인터페이스
+- FirebaseOrderStore: firebase_admin.db /orders 참조 래퍼
+- LocalOrderStore: 인메모리 (+ 선택적 로컬 JSON 파일) 대체 구현
+  → 클라우드 없이 주문 → Pose 경로 측정/테스트용
+------------------------------------
+"""
+
+import os
+import copy
+import json
+import queue
+import threading
+
+
+class OrderEvent:
+    """listen 콜백으로 전달되는 이벤트 (firebase_admin.db.Event와 동일한 속성)"""
+
+    def __init__(self, event_type, path, data):
+        self.event_type = event_type  # "put" 또는 "patch"
+        self.path = path              # "/" 또는 "/ORDER-1" 등
+        self.data = data
+
+    def __repr__(self):
+        return f"OrderEvent({self.event_type!r}, {self.path!r})"
+
+
+class OrderStore:
+    """주문 저장소 공통 인터페이스"""
+
+    def get(self):
+        """전체 주문 딕셔너리 반환 (비어 있으면 None)"""
+        raise NotImplementedError
+
+    def get_order(self, order_id):
+        """단일 주문 데이터 반환 (없으면 None)"""
+        raise NotImplementedError
+
+    def set(self, order_id, data):
+        """주문 전체를 덮어쓰기"""
+        raise NotImplementedError
+
+    def update(self, order_id, data):
+        """주문의 일부 필드만 갱신 (값이 None이면 해당 필드 삭제)"""
+        raise NotImplementedError
+
+    def listen(self, callback):
+        """변경 이벤트 구독. close() 메서드가 있는 등록 객체 반환"""
+        raise NotImplementedError
+
+
+class FirebaseOrderStore(OrderStore):
+    """firebase_admin.db.Reference(/orders) 기반 구현"""
+
+    def __init__(self, orders_ref):
+        self.orders_ref = orders_ref
+
+    def get(self):
+        return self.orders_ref.get()
+
+    def get_order(self, order_id):
+        return self.orders_ref.child(order_id).get()
+
+    def set(self, order_id, data):
+        self.orders_ref.child(order_id).set(data)
+
+    def update(self, order_id, data):
+        self.orders_ref.child(order_id).update(data)
+
+    def listen(self, callback):
+        # firebase_admin이 db.Event(event_type, path, data)로 콜백 호출
+        return self.orders_ref.listen(callback)
+
+
+class _LocalListener:
+    """LocalOrderStore 구독 등록 객체 (별도 스레드에서 콜백 실행)"""
+
+    def __init__(self, store, callback):
+        self._store = store
+        self._callback = callback
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._thread.start()
+
+    def push(self, event):
+        self._queue.put(event)
+
+    def _dispatch_loop(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            try:
+                self._callback(event)
+            except Exception as e:
+                print(f"[OrderStore] Listener callback error: {e}")
+
+    def close(self):
+        self._store._remove_listener(self)
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+
+
+class LocalOrderStore(OrderStore):
+    """
+    인메모리 주문 저장소 (Firebase Realtime DB 동작 모사)
+
+    - get()은 항상 복사본을 반환 (Firebase처럼 호출자 수정이 저장소에 반영되지 않음)
+    - listen()은 구독 즉시 전체 스냅샷 "put" 이벤트, 이후 변경마다 이벤트 전달
+    - path가 주어지면 로컬 JSON 파일에서 로드하고, 변경 시마다 저장
+    """
+
+    def __init__(self, path=None, initial_data=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._orders = {}
+
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._orders = json.load(f) or {}
+            print(f"[OrderStore] Loaded {len(self._orders)} orders from {path}")
+        if initial_data:
+            self._orders.update(copy.deepcopy(initial_data))
+
+    def get(self):
+        with self._lock:
+            return copy.deepcopy(self._orders) if self._orders else None
+
+    def get_order(self, order_id):
+        with self._lock:
+            return copy.deepcopy(self._orders.get(order_id))
+
+    def set(self, order_id, data):
+        with self._lock:
+            if data is None:
+                self._orders.pop(order_id, None)
+            else:
+                self._orders[order_id] = copy.deepcopy(data)
+            self._save()
+            self._notify(OrderEvent("put", f"/{order_id}", copy.deepcopy(data)))
+
+    def update(self, order_id, data):
+        with self._lock:
+            order = self._orders.setdefault(order_id, {})
+            for key, value in data.items():
+                if value is None:
+                    order.pop(key, None)
+                else:
+                    order[key] = copy.deepcopy(value)
+            if not order:
+                self._orders.pop(order_id, None)
+            self._save()
+            self._notify(OrderEvent("patch", f"/{order_id}", copy.deepcopy(data)))
+
+    def listen(self, callback):
+        listener = _LocalListener(self, callback)
+        with self._lock:
+            self._listeners.append(listener)
+            listener.push(OrderEvent("put", "/", copy.deepcopy(self._orders) or None))
+        return listener
+
+    def _remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self, event):
+        # _lock을 잡은 상태에서 호출 → 이벤트 순서가 쓰기 순서와 동일
+        for listener in self._listeners:
+            listener.push(event)
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._orders, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
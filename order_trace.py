@@ -0,0 +1,123 @@
+"""
+order_trace.py
+------------------------------------
+주문별 지연시간 추적 모듈
+- 주문 단위로 단계별 타임스탬프 기록
+  appeared     : 모니터가 waiting_pose 주문을 처음 감지한 시각
+  detected     : 주문 감지 이후 첫 물체 감지 프레임 시각
+  transformed  : 픽셀 → 로봇 좌표 변환 완료 시각
+  pose_written : 주문 저장소에 Pose 기록 완료 시각
+- 구간별/종단간 지연시간 히스토그램 리포트
+------------------------------------
+"""
+
+import json
+import time
+import threading
+
+import numpy as np
+
+
+STAGES = ("appeared", "detected", "transformed", "pose_written")
+
+# 리포트 구간 (이름, 시작 단계, 끝 단계)
+SEGMENTS = (
+    ("appear_to_detect", "appeared", "detected"),
+    ("detect_to_transform", "detected", "transformed"),
+    ("transform_to_write", "transformed", "pose_written"),
+    ("end_to_end", "appeared", "pose_written"),
+)
+
+DEFAULT_BINS_MS = [0, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class OrderTracer:
+    """주문별 단계 타임스탬프 기록기 (스레드 안전)"""
+
+    def __init__(self, bins_ms=None):
+        self.bins_ms = list(bins_ms or DEFAULT_BINS_MS)
+        self._traces = {}
+        self._lock = threading.Lock()
+
+    def mark(self, order_id, stage, timestamp=None):
+        """
+        단계 타임스탬프 기록 (같은 주문/단계는 첫 기록만 유지)
+        appeared가 없는 주문(수동 전송 등)이나 appeared보다 이른 시각은 무시
+        (예: 모니터가 주문을 감지하기 전에 캡처된 프레임)
+        """
+        if order_id is None or stage not in STAGES:
+            return
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if stage == "appeared":
+                self._traces.setdefault(order_id, {}).setdefault(stage, ts)
+                return
+            trace = self._traces.get(order_id)
+            if trace is not None and ts >= trace["appeared"]:
+                trace.setdefault(stage, ts)
+
+    def has_mark(self, order_id, stage):
+        with self._lock:
+            return stage in self._traces.get(order_id, {})
+
+    def traces(self):
+        with self._lock:
+            return {oid: dict(t) for oid, t in self._traces.items()}
+
+    def latencies(self, traces=None):
+        """구간별 지연시간 목록 (ms), traces를 주면 그 스냅샷 기준"""
+        traces = self.traces() if traces is None else traces
+        result = {name: [] for name, _, _ in SEGMENTS}
+        for trace in traces.values():
+            for name, start, end in SEGMENTS:
+                if start in trace and end in trace:
+                    result[name].append((trace[end] - trace[start]) * 1000.0)
+        return result
+
+    def histograms(self, traces=None, latencies=None):
+        """구간별 히스토그램 {구간: (counts, bin_edges)} - 마지막 bin은 상한 없음"""
+        edges = np.array(self.bins_ms + [np.inf], dtype=np.float64)
+        latencies = self.latencies(traces) if latencies is None else latencies
+        hists = {}
+        for name, values in latencies.items():
+            counts, _ = np.histogram(np.asarray(values, dtype=np.float64), bins=edges)
+            hists[name] = (counts.tolist(), edges.tolist())
+        return hists
+
+    def report(self):
+        """지연시간 요약 + 히스토그램 텍스트"""
+        # 모니터/Vision 스레드가 계속 기록하므로 잠금 상태에서 복사한 스냅샷으로 계산
+        traces = self.traces()
+        lines = [f"[Trace] Orders traced: {len(traces)}"]
+        latencies = self.latencies(traces)
+        for name, (counts, edges) in self.histograms(latencies=latencies).items():
+            values = latencies[name]
+            if not values:
+                lines.append(f"  {name}: (no samples)")
+                continue
+            arr = np.asarray(values)
+            lines.append(
+                f"  {name}: n={len(arr)}, mean={arr.mean():.1f}ms, "
+                f"p50={np.percentile(arr, 50):.1f}ms, p95={np.percentile(arr, 95):.1f}ms, max={arr.max():.1f}ms"
+            )
+            peak = max(counts) or 1
+            for i, count in enumerate(counts):
+                hi = "inf" if np.isinf(edges[i + 1]) else f"{edges[i + 1]:.0f}"
+                bar = "#" * int(round(30 * count / peak))
+                lines.append(f"    [{edges[i]:>6.0f}, {hi:>6}) ms {count:>6} {bar}")
+        return "\n".join(lines)
+
+    def save(self, path):
+        """원본 트레이스 + 히스토그램을 JSON으로 저장"""
+        traces = self.traces()
+        data = {
+            "stages": list(STAGES),
+            "traces": traces,
+            "histograms_ms": {
+                name: {"counts": counts, "bin_edges": [e if np.isfinite(e) else None for e in edges]}
+                for name, (counts, edges) in self.histograms(traces).items()
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"[Trace] Saved to {path}")
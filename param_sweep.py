@@ -0,0 +1,254 @@
+"""
+param_sweep.py
+------------------------------------
+경계 검출 파라미터 스윕 도구
+- 녹화 프레임(frame_dataset 구조)에 대해 edge_detection 파라미터 조합을
+  프로세스 풀로 병렬 평가
+- 조합별 측정 항목
+  · detection_rate   : 물체 감지 비율
+  · centroid_jitter  : 같은 장면(그룹) 안에서 중심 좌표 표준편차 (px)
+  · centroid_bias    : 현재 config 설정 대비 그룹별 평균 중심 차이 (px)
+  · angle_jitter     : 최단축 방향 원형 표준편차 (deg)
+  · axis_jitter      : 최단축 길이 표준편차 (px)
+  · frame_ms         : 프레임당 처리 시간 (ms)
+- 파레토 최적 조합 출력 + 바로 붙여넣을 수 있는 edge_detection 블록 생성
+
+사용법:
+    python param_sweep.py recordings                      # 기본 그리드
+    python param_sweep.py recordings --grid grid.json --workers 8 --out sweep.json
+    grid.json 예: {"canny_threshold1": [30, 50], "gaussian_blur_kernel": [3, 5]}
+------------------------------------
+"""
+
+import copy
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config_loader import load_config
+from frame_dataset import load_frame_groups
+from vision_engine import VisionEngine
+
+
+DEFAULT_GRID = {
+    "canny_threshold1": [30, 50, 80],
+    "canny_threshold2": [100, 150, 200],
+    "gaussian_blur_kernel": [3, 5, 7],
+    "min_contour_area": [300, 500, 1000],
+    "morph_kernel_size": [3, 5, 7],
+}
+
+# (항목, 최대화 여부)
+OBJECTIVES = (
+    ("detection_rate", True),
+    ("centroid_jitter", False),
+    ("centroid_bias", False),
+    ("angle_jitter", False),
+    ("axis_jitter", False),
+    ("frame_ms", False),
+)
+
+# 추천 조건: 흔들림 항목별 현재 설정 대비 허용 증가량 (px, deg, px)
+STABILITY_TOLERANCE = {
+    "centroid_jitter": 0.5,
+    "angle_jitter": 0.25,
+    "axis_jitter": 0.5,
+}
+
+# 워커 프로세스 전역 (프레임은 워커마다 한 번만 로드)
+_FRAMES = None
+_CONFIG = None
+
+
+def _init_worker(frames_dir, limit, config):
+    global _FRAMES, _CONFIG
+    import cv2
+    cv2.setNumThreads(1)  # 프로세스 병렬이므로 OpenCV 내부 스레드는 끔
+    _FRAMES = load_frame_groups(frames_dir, limit)
+    _CONFIG = config
+
+
+def _axis_orientation_std(angles_deg):
+    """최단축 방향(0~180° 주기) 원형 표준편차 (deg)"""
+    if len(angles_deg) < 2:
+        return 0.0
+    doubled = np.radians(np.asarray(angles_deg)) * 2.0
+    R = np.hypot(np.cos(doubled).mean(), np.sin(doubled).mean())
+    return float(np.degrees(np.sqrt(-2.0 * np.log(max(R, 1e-12))) / 2.0))
+
+
+def evaluate(params):
+    """파라미터 조합 1개 평가 (워커 프로세스에서 실행)"""
+    config = copy.deepcopy(_CONFIG)
+    config["edge_detection"].update(params)
+    config["edge_detection"]["tiles"] = 1
+    engine = VisionEngine(config)
+
+    total_frames = 0
+    detected = 0
+    frame_times = []
+    groups = {}
+    for name, frames in _FRAMES.items():
+        cxs, cys, angles, lengths = [], [], [], []
+        for frame in frames:
+            start = time.perf_counter()
+            det = engine.process_frame(frame, keep_edges=False).detection
+            frame_times.append((time.perf_counter() - start) * 1000.0)
+            total_frames += 1
+            if det:
+                detected += 1
+                cxs.append(det.cx)
+                cys.append(det.cy)
+                angles.append(det.angle)
+                lengths.append(det.axis_length)
+        groups[name] = {
+            "mean": (float(np.mean(cxs)), float(np.mean(cys))) if cxs else None,
+            "jitter": float(np.hypot(np.std(cxs), np.std(cys))) if cxs else None,
+            "angle_jitter": _axis_orientation_std(angles) if angles else None,
+            "axis_jitter": float(np.std(lengths)) if lengths else None,
+        }
+    engine.close()
+
+    def mean_of(key):
+        values = [g[key] for g in groups.values() if g[key] is not None]
+        return float(np.mean(values)) if values else float("inf")
+
+    return {
+        "params": params,
+        "detection_rate": detected / total_frames if total_frames else 0.0,
+        "centroid_jitter": mean_of("jitter"),
+        "angle_jitter": mean_of("angle_jitter"),
+        "axis_jitter": mean_of("axis_jitter"),
+        "frame_ms": float(np.median(frame_times)) if frame_times else 0.0,
+        "group_means": {name: g["mean"] for name, g in groups.items()},
+    }
+
+
+def add_bias(results, baseline):
+    """현재 config 설정(baseline) 대비 그룹별 평균 중심 차이"""
+    for r in results:
+        diffs = []
+        for name, mean in r["group_means"].items():
+            ref = baseline["group_means"].get(name)
+            if mean is not None and ref is not None:
+                diffs.append(np.hypot(mean[0] - ref[0], mean[1] - ref[1]))
+        r["centroid_bias"] = float(np.mean(diffs)) if diffs else float("inf")
+
+
+def pareto_front(results):
+    """OBJECTIVES 기준 지배당하지 않는 조합 목록"""
+    def as_costs(r):
+        return np.array([-r[k] if maximize else r[k] for k, maximize in OBJECTIVES])
+
+    costs = [as_costs(r) for r in results]
+    front = []
+    for i, ci in enumerate(costs):
+        dominated = any(np.all(cj <= ci) and np.any(cj < ci) for j, cj in enumerate(costs) if j != i)
+        if not dominated:
+            front.append(results[i])
+    return sorted(front, key=lambda r: r["frame_ms"])
+
+
+def edge_block(base_edge_cfg, params):
+    """config.json에 붙여넣을 edge_detection 블록 (JSON 문자열)"""
+    block = dict(base_edge_cfg)
+    block.update(params)
+    return '"edge_detection": ' + json.dumps(block, ensure_ascii=False, indent=2)
+
+
+def main():
+    config = load_config()
+    edge_cfg = config["edge_detection"]
+
+    parser = argparse.ArgumentParser(description="경계 검출 파라미터 스윕")
+    parser.add_argument("frames", help="녹화 프레임 폴더 (하위 폴더 = 장면 그룹)")
+    parser.add_argument("--grid", default=None, help="파라미터 그리드 JSON 파일 (기본: 내장 그리드)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--limit", type=int, default=None, help="그룹당 최대 프레임 수")
+    parser.add_argument("--min-rate", type=float, default=None,
+                        help="추천 조합의 최소 감지율 (기본: 현재 설정 감지율)")
+    parser.add_argument("--min-speedup", type=float, default=0.1,
+                        help="추천 조합의 최소 속도 향상 비율 (기본 0.1 = 현재 설정보다 10%% 이상 빠를 때만)")
+    parser.add_argument("--out", default=None, help="전체 결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, "r", encoding="utf-8") as f:
+            grid = json.load(f)
+    keys = list(grid.keys())
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    # canny_threshold1 < canny_threshold2, 블러 커널은 홀수만 유효
+    combos = [c for c in combos
+              if c.get("canny_threshold1", edge_cfg["canny_threshold1"]) < c.get("canny_threshold2", edge_cfg["canny_threshold2"])
+              and c.get("gaussian_blur_kernel", 1) % 2 == 1]
+    # 현재 설정도 같은 조건(동시 실행 부하)에서 측정되도록 조합 목록에 포함
+    baseline_params = {k: edge_cfg[k] for k in keys if k in edge_cfg}
+    if baseline_params not in combos:
+        combos.append(baseline_params)
+
+    print("=" * 80)
+    print("🔍 경계 검출 파라미터 스윕")
+    print("=" * 80)
+    print(f"[설정] 프레임 폴더: {args.frames}, 조합 수: {len(combos)}")
+    print(f"[설정] 현재 설정: {baseline_params}\n")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.frames, args.limit, config)) as pool:
+        results = []
+        for i, r in enumerate(pool.map(evaluate, combos, chunksize=4), 1):
+            results.append(r)
+            if i % 20 == 0 or i == len(combos):
+                print(f"[Sweep] {i}/{len(combos)} ({time.perf_counter() - start:.1f}s)")
+
+    baseline = next(r for r in results if r["params"] == baseline_params)
+    add_bias(results, baseline)
+    front = pareto_front(results)
+
+    header = f"{'rate':>6}{'jitter':>8}{'bias':>7}{'angle':>7}{'axis':>7}{'ms':>7}  params"
+    def row(r):
+        return (f"{r['detection_rate'] * 100:>5.1f}%{r['centroid_jitter']:>8.2f}{r['centroid_bias']:>7.2f}"
+                f"{r['angle_jitter']:>7.2f}{r['axis_jitter']:>7.2f}{r['frame_ms']:>7.2f}  {r['params']}")
+
+    print("\n[Baseline] (현재 config)")
+    print(header)
+    print(row(baseline))
+    print(f"\n[Pareto front] {len(front)} / {len(results)} combinations")
+    print(header)
+    for r in front:
+        print(row(r))
+
+    # 추천: 감지율/흔들림(중심, 각도, 최단축)이 현재 설정 수준이면서
+    # 측정 잡음 이상으로(min_speedup) 빠른 파레토 조합 중 가장 빠른 것
+    min_rate = baseline["detection_rate"] if args.min_rate is None else args.min_rate
+    max_ms = baseline["frame_ms"] * (1.0 - args.min_speedup)
+    candidates = [r for r in front
+                  if r["frame_ms"] <= max_ms
+                  and r["detection_rate"] >= min_rate
+                  and all(r[k] <= baseline[k] + tol for k, tol in STABILITY_TOLERANCE.items())
+                  and r["centroid_bias"] <= 2.0]
+    if candidates:
+        best = candidates[0]
+        print(f"\n[Recommended] {best['frame_ms']:.2f}ms/frame (현재 {baseline['frame_ms']:.2f}ms), "
+              f"감지율 {best['detection_rate'] * 100:.1f}%")
+        print(edge_block(edge_cfg, best["params"]))
+    else:
+        print("\n[Recommended] 현재 설정보다 나은 조합 없음")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({
+                "baseline": baseline,
+                "pareto_front": [dict(r, edge_detection=dict(edge_cfg, **r["params"])) for r in front],
+                "all": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n[Sweep] Saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
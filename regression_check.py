@@ -0,0 +1,200 @@
+"""
+regression_check.py
+------------------------------------
+정확도 / 지연시간 회귀 테스트 (카메라, 네트워크 불필요)
+- 섹터별 녹화 프레임(recordings/sector1, sector2, sector3)을
+  VisionEngine → pixel_to_robot_coords 실제 경로로 재생
+- 정답 좌표(config.json test_sectors.target_coords, 없으면 SECTOR_ANSWERS)와 비교하여
+  X/Y/Z 축별 오차(mm)와 프레임당 처리 시간(감지 + 좌표 변환) 출력
+- config.json regression 섹션의 허용 범위를 넘으면 종료 코드 1
+
+사용법:
+    python regression_check.py                        # regression.recordings_dir 사용
+    python regression_check.py recordings --limit 50 --out regression_report.json
+------------------------------------
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from config_loader import load_config
+from constants import SECTOR_ANSWERS
+from coordinate_transform import pixel_to_robot_coords
+from frame_dataset import load_frame_groups
+from vision_engine import VisionEngine
+
+
+AXES = ("X", "Y", "Z")
+
+# 오차 허용 범위는 숫자(전 축 공통) 또는 {"X": .., "Y": .., "Z": ..}
+DEFAULT_BUDGET = {
+    "max_mean_error_mm": 10.0,
+    "max_abs_error_mm": 25.0,
+    "max_p95_latency_ms": 50.0,
+    "min_detection_rate": 0.9,
+}
+
+
+def sector_of(group_name):
+    """'sector2' / 'day1/sector2' 같은 그룹 이름 → 섹터 ID (없으면 None)"""
+    m = re.search(r"sector(\d+)$", group_name)
+    return int(m.group(1)) if m else None
+
+
+def ground_truth(config, sector_id):
+    """
+    섹터 정답 좌표 [X, Y, Z, Roll, Pitch, Yaw]
+    Z는 변환 경로가 SECTOR_ANSWERS Z에 pixel_calibration.offset_z_cm을 더해 내보내므로 정답에도 같은 오프셋 반영
+    """
+    sector_cfg = config.get("test_sectors", {}).get(f"sector{sector_id}", {})
+    truth = sector_cfg.get("target_coords", SECTOR_ANSWERS.get(sector_id))
+    if truth is None:
+        return None
+    truth = list(truth)
+    offset_z_cm = config.get("pixel_calibration", {}).get(f"sector{sector_id}", {}).get("offset_z_cm", 0.0)
+    truth[2] += offset_z_cm * 10.0  # cm → mm
+    return truth
+
+
+def replay_group(engine, config, sector_id, frames):
+    """프레임 그룹 재생 → 프레임별 (오차 XYZ 또는 None, 처리 시간 ms)"""
+    robot_transform = config.get("robot_transform", {})
+    truth = ground_truth(config, sector_id)
+    errors, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        det = engine.process_frame(frame, keep_edges=False).detection
+        if det:
+            coords = pixel_to_robot_coords(
+                det.cx, det.cy, config.get("calibration_points", {}),
+                sector_id=sector_id,
+                sector_answers=SECTOR_ANSWERS,
+                base_roll=robot_transform.get("base_roll", 0.0),
+                base_pitch=robot_transform.get("base_pitch", 0.0),
+                base_yaw=robot_transform.get("base_yaw", 0.0),
+                pixel_calibration=config.get("pixel_calibration", {}),
+                verbose=False
+            )
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        errors.append([coords[i] - truth[i] for i in range(3)] if det else None)
+    return errors, latencies
+
+
+def summarize_group(errors, latencies):
+    found = np.array([e for e in errors if e is not None], dtype=np.float64).reshape(-1, 3)
+    lat = np.asarray(latencies)
+    summary = {
+        "frames": len(errors),
+        "detection_rate": len(found) / len(errors) if errors else 0.0,
+        "latency_p50_ms": float(np.percentile(lat, 50)) if len(lat) else 0.0,
+        "latency_p95_ms": float(np.percentile(lat, 95)) if len(lat) else 0.0,
+    }
+    for i, axis in enumerate(AXES):
+        col = found[:, i]
+        summary[f"mean_error_{axis}"] = float(col.mean()) if len(col) else None
+        summary[f"max_abs_error_{axis}"] = float(np.abs(col).max()) if len(col) else None
+    return summary
+
+
+def _axis_limit(limit, axis):
+    return limit.get(axis, float("inf")) if isinstance(limit, dict) else limit
+
+
+def check_budget(summary, budget):
+    """허용 범위 초과 항목 목록"""
+    failures = []
+    if summary["detection_rate"] < budget["min_detection_rate"]:
+        failures.append(f"detection_rate {summary['detection_rate'] * 100:.1f}% < {budget['min_detection_rate'] * 100:.1f}%")
+    for axis in AXES:
+        mean_err = summary[f"mean_error_{axis}"]
+        max_err = summary[f"max_abs_error_{axis}"]
+        if mean_err is None:
+            continue
+        mean_limit = _axis_limit(budget["max_mean_error_mm"], axis)
+        max_limit = _axis_limit(budget["max_abs_error_mm"], axis)
+        if abs(mean_err) > mean_limit:
+            failures.append(f"{axis} mean error {mean_err:+.2f}mm > ±{mean_limit}mm")
+        if max_err > max_limit:
+            failures.append(f"{axis} max error {max_err:.2f}mm > {max_limit}mm")
+    if summary["latency_p95_ms"] > budget["max_p95_latency_ms"]:
+        failures.append(f"p95 latency {summary['latency_p95_ms']:.2f}ms > {budget['max_p95_latency_ms']}ms")
+    return failures
+
+
+def main():
+    config = load_config()
+    reg_cfg = config.get("regression", {})
+    budget = dict(DEFAULT_BUDGET)
+    budget.update({k: v for k, v in reg_cfg.items() if k in DEFAULT_BUDGET})
+
+    parser = argparse.ArgumentParser(description="정확도 / 지연시간 회귀 테스트")
+    parser.add_argument("frames", nargs="?", default=reg_cfg.get("recordings_dir", "recordings"),
+                        help="녹화 프레임 폴더 (하위 폴더 sector1, sector2, sector3)")
+    parser.add_argument("--limit", type=int, default=None, help="섹터당 최대 프레임 수")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🧪 정확도 / 지연시간 회귀 테스트")
+    print("=" * 80)
+    print(f"[설정] 프레임 폴더: {args.frames}")
+    print(f"[설정] 허용 범위: {budget}\n")
+
+    groups = load_frame_groups(args.frames, args.limit)
+    engine = VisionEngine(config)
+    # 첫 호출 초기화 비용은 측정에서 제외
+    for frames in groups.values():
+        engine.process_frame(frames[0], keep_edges=False)
+        break
+
+    results = {}
+    for name, frames in groups.items():
+        sector_id = sector_of(name)
+        if sector_id is None or ground_truth(config, sector_id) is None:
+            print(f"[Regression] ⚠️  '{name}': 섹터 정답 좌표 없음, 건너뜀")
+            continue
+        errors, latencies = replay_group(engine, config, sector_id, frames)
+        summary = summarize_group(errors, latencies)
+        summary["sector"] = sector_id
+        summary["failures"] = check_budget(summary, budget)
+        results[name] = summary
+    engine.close()
+
+    if not results:
+        print(f"[Regression] ❌ 섹터 프레임 없음: {args.frames}")
+        sys.exit(2)
+
+    print(f"{'Group':<16}{'n':>5}{'rate':>8}" + "".join(f"{'mean ' + a:>10}{'max ' + a:>9}" for a in AXES)
+          + f"{'p50':>8}{'p95':>8}  (mm, ms)")
+    for name, s in results.items():
+        cols = ""
+        for axis in AXES:
+            mean_err, max_err = s[f"mean_error_{axis}"], s[f"max_abs_error_{axis}"]
+            cols += f"{mean_err:>+10.2f}{max_err:>9.2f}" if mean_err is not None else f"{'-':>10}{'-':>9}"
+        print(f"{name:<16}{s['frames']:>5}{s['detection_rate'] * 100:>7.1f}%{cols}"
+              f"{s['latency_p50_ms']:>8.2f}{s['latency_p95_ms']:>8.2f}")
+
+    failed = {name: s["failures"] for name, s in results.items() if s["failures"]}
+    print("=" * 80)
+    for name, failures in failed.items():
+        for f in failures:
+            print(f"[Regression] ❌ {name}: {f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"budget": budget, "groups": results}, f, ensure_ascii=False, indent=2)
+        print(f"[Regression] Saved to {args.out}")
+
+    if failed:
+        print(f"[Regression] FAILED ({len(failed)} / {len(results)} groups)")
+        sys.exit(1)
+    print(f"[Regression] PASSED ({len(results)} groups)")
+
+
+if __name__ == "__main__":
+    main()
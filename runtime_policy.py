@@ -0,0 +1,249 @@
+"""
+runtime_policy.py
+------------------------------------
+CPU 스레드 / 코어 고정 정책 (config.json runtime 섹션)
+- cv2.setNumThreads: OpenCV 내부 스레드 풀 크기
+- 스레드 역할별(vision: 캡처+감지 메인 루프, monitor: 주문 모니터 스레드)
+  CPU 코어 고정(affinity)과 우선순위 설정
+  · Linux  : os.sched_setaffinity / os.setpriority (스레드 ID 기준)
+  · Windows: SetThreadAffinityMask / SetThreadPriority (ctypes)
+  · 새로 만든 스레드는 만든 스레드의 코어 설정을 물려받음
+    (OpenCV 스레드 풀은 vision 스레드에서 만들어지므로 vision 코어 사용)
+  · cpus가 null인 역할은 프로세스 원래 코어 설정으로 되돌림 (물려받은 고정 해제)
+- ThreadStats: 스레드별 CPU 사용률 / 문맥 전환(context switch) 횟수 측정
+  · Linux  : /proc/self/task/<tid>/stat, status
+  · Windows: GetThreadTimes (문맥 전환 횟수는 측정 안함)
+------------------------------------
+"""
+
+import os
+import sys
+import time
+import threading
+
+import cv2
+
+
+# 우선순위 이름 → (Linux nice 값, Windows 스레드 우선순위)
+PRIORITIES = {
+    "low": (5, -1),        # THREAD_PRIORITY_BELOW_NORMAL
+    "normal": (0, 0),      # THREAD_PRIORITY_NORMAL
+    "high": (-5, 1),       # THREAD_PRIORITY_ABOVE_NORMAL
+    "highest": (-10, 2),   # THREAD_PRIORITY_HIGHEST
+}
+
+# 정책을 적용한 스레드 {native thread id: 역할 이름}
+_thread_roles = {}
+_roles_lock = threading.Lock()
+
+# 코어 고정 전 프로세스 원래 CPU 목록 (Linux, 모듈 임포트 시점 = 어떤 스레드도 고정하기 전)
+# Windows는 SetThreadAffinityMask가 프로세스 마스크를 바꾸지 않으므로 GetProcessAffinityMask 사용
+_original_cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+
+
+def _kernel32():
+    import ctypes
+    from ctypes import wintypes
+    k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    k32.GetCurrentThread.restype = wintypes.HANDLE
+    k32.SetThreadAffinityMask.argtypes = [wintypes.HANDLE, ctypes.c_size_t]
+    k32.SetThreadAffinityMask.restype = ctypes.c_size_t
+    k32.SetThreadPriority.argtypes = [wintypes.HANDLE, ctypes.c_int]
+    k32.SetThreadPriority.restype = wintypes.BOOL
+    k32.OpenThread.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    k32.OpenThread.restype = wintypes.HANDLE
+    k32.GetThreadTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(wintypes.FILETIME)] * 4
+    k32.GetThreadTimes.restype = wintypes.BOOL
+    k32.CloseHandle.argtypes = [wintypes.HANDLE]
+    k32.GetCurrentProcess.restype = wintypes.HANDLE
+    k32.GetProcessAffinityMask.argtypes = [wintypes.HANDLE, ctypes.POINTER(ctypes.c_size_t),
+                                           ctypes.POINTER(ctypes.c_size_t)]
+    k32.GetProcessAffinityMask.restype = wintypes.BOOL
+    return k32
+
+
+def _process_affinity_mask(k32):
+    import ctypes
+    process_mask, system_mask = ctypes.c_size_t(), ctypes.c_size_t()
+    if not k32.GetProcessAffinityMask(k32.GetCurrentProcess(), ctypes.byref(process_mask), ctypes.byref(system_mask)):
+        raise OSError("GetProcessAffinityMask failed")
+    return process_mask.value
+
+
+def apply_opencv_threads(runtime_cfg):
+    """runtime.opencv_threads 적용 (null이면 OpenCV 기본값 유지)"""
+    n = runtime_cfg.get("opencv_threads")
+    if n is not None:
+        cv2.setNumThreads(int(n))
+    print(f"[Runtime] OpenCV threads: {cv2.getNumThreads()}")
+
+
+def apply_thread_policy(runtime_cfg, role):
+    """
+    현재 스레드에 runtime.threads.<role> 정책 적용
+        cpus: 고정할 CPU 코어 번호 목록 (null이면 프로세스 원래 코어 설정으로 복원)
+        priority: low / normal / high / highest (null이면 변경 안함)
+    권한 부족 등으로 실패하면 경고만 출력하고 계속 실행
+    """
+    policy = runtime_cfg.get("threads", {}).get(role, {})
+    tid = threading.get_native_id()
+    with _roles_lock:
+        _thread_roles[tid] = role
+
+    cpus = policy.get("cpus")
+    priority = policy.get("priority")
+    if priority is not None and priority not in PRIORITIES:
+        print(f"[Runtime] ⚠️  Unknown priority '{priority}' for {role} (expected {', '.join(PRIORITIES)})")
+        priority = None
+
+    applied = []
+    try:
+        if sys.platform.startswith("linux"):
+            if cpus:
+                os.sched_setaffinity(tid, cpus)
+                applied.append(f"cpus={sorted(os.sched_getaffinity(tid))}")
+            elif _original_cpus and sorted(os.sched_getaffinity(tid)) != _original_cpus:
+                os.sched_setaffinity(tid, _original_cpus)
+                applied.append(f"cpus={_original_cpus} (restored)")
+            if priority:
+                os.setpriority(os.PRIO_PROCESS, tid, PRIORITIES[priority][0])
+                applied.append(f"nice={os.getpriority(os.PRIO_PROCESS, tid)}")
+        elif sys.platform == "win32":
+            k32 = _kernel32()
+            handle = k32.GetCurrentThread()
+            if cpus:
+                mask = sum(1 << c for c in cpus)
+                if not k32.SetThreadAffinityMask(handle, mask):
+                    raise OSError(f"SetThreadAffinityMask failed (mask=0x{mask:x})")
+                applied.append(f"cpus={sorted(cpus)}")
+            else:
+                # 이전 마스크를 반환하므로 프로세스 마스크와 다를 때만 복원으로 표시
+                mask = _process_affinity_mask(k32)
+                previous = k32.SetThreadAffinityMask(handle, mask)
+                if not previous:
+                    raise OSError(f"SetThreadAffinityMask failed (mask=0x{mask:x})")
+                if previous != mask:
+                    applied.append(f"cpus=0x{mask:x} (restored)")
+            if priority:
+                if not k32.SetThreadPriority(handle, PRIORITIES[priority][1]):
+                    raise OSError("SetThreadPriority failed")
+                applied.append(f"priority={priority}")
+        elif cpus or priority:
+            print(f"[Runtime] ⚠️  Thread affinity/priority not supported on {sys.platform}")
+    except (OSError, ValueError) as e:
+        print(f"[Runtime] ⚠️  {role} thread policy failed: {e}")
+
+    print(f"[Runtime] {role} thread (tid {tid}): {', '.join(applied) if applied else 'default'}")
+
+
+class ThreadStats:
+    """
+    스레드별 CPU 사용률 / 문맥 전환 횟수 (이전 sample() 이후 변화량)
+    Linux는 프로세스의 모든 스레드(OpenCV 워커 포함), Windows는 정책을 적용한 스레드만 측정
+    """
+
+    def __init__(self):
+        self._clk_tck = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._last = None
+        self._last_time = None
+
+    def _read_linux(self):
+        threads = {}
+        for name in os.listdir("/proc/self/task"):
+            tid = int(name)
+            try:
+                with open(f"/proc/self/task/{tid}/stat") as f:
+                    stat = f.read()
+                with open(f"/proc/self/task/{tid}/status") as f:
+                    status = dict(line.split(":", 1) for line in f if ":" in line)
+            except OSError:
+                continue  # 읽는 중에 종료된 스레드
+            # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 이후부터 필드 분리
+            comm = stat[stat.index("(") + 1:stat.rindex(")")]
+            fields = stat[stat.rindex(")") + 2:].split()
+            threads[tid] = {
+                "name": comm,
+                "cpu_sec": (int(fields[11]) + int(fields[12])) / self._clk_tck,  # utime + stime
+                "voluntary": int(status["voluntary_ctxt_switches"]),
+                "involuntary": int(status["nonvoluntary_ctxt_switches"]),
+                "core": int(fields[36]),  # 마지막 실행 CPU
+            }
+        return threads
+
+    def _read_windows(self):
+        from ctypes import byref
+        from ctypes import wintypes
+        k32 = _kernel32()
+        threads = {}
+        with _roles_lock:
+            tids = list(_thread_roles)
+        for tid in tids:
+            handle = k32.OpenThread(0x0800, False, tid)  # THREAD_QUERY_LIMITED_INFORMATION
+            if not handle:
+                continue
+            times = [wintypes.FILETIME() for _ in range(4)]
+            if k32.GetThreadTimes(handle, *(byref(t) for t in times)):
+                kernel, user = times[2], times[3]
+                ticks = ((kernel.dwHighDateTime << 32) | kernel.dwLowDateTime) + \
+                        ((user.dwHighDateTime << 32) | user.dwLowDateTime)
+                threads[tid] = {"name": "", "cpu_sec": ticks / 1e7,  # 100ns 단위
+                                "voluntary": None, "involuntary": None, "core": None}
+            k32.CloseHandle(handle)
+        return threads
+
+    def sample(self):
+        """
+        이전 호출 이후 스레드별 변화량 목록 (첫 호출은 빈 목록)
+        [{"tid", "role", "cpu_pct", "voluntary_per_sec", "involuntary_per_sec", "core"}, ...]
+        """
+        if sys.platform.startswith("linux"):
+            current = self._read_linux()
+        elif sys.platform == "win32":
+            current = self._read_windows()
+        else:
+            return []
+        now = time.perf_counter()
+        last, elapsed = self._last, (now - self._last_time) if self._last_time else 0.0
+        self._last, self._last_time = current, now
+        if not last or elapsed <= 0:
+            return []
+
+        with _roles_lock:
+            roles = dict(_thread_roles)
+        rows = []
+        for tid, cur in current.items():
+            prev = last.get(tid)
+            if prev is None:
+                continue
+            row = {
+                "tid": tid,
+                "role": roles.get(tid, cur["name"]),
+                "cpu_pct": (cur["cpu_sec"] - prev["cpu_sec"]) / elapsed * 100.0,
+                "voluntary_per_sec": None,
+                "involuntary_per_sec": None,
+                "core": cur["core"],
+            }
+            if cur["voluntary"] is not None:
+                row["voluntary_per_sec"] = (cur["voluntary"] - prev["voluntary"]) / elapsed
+                row["involuntary_per_sec"] = (cur["involuntary"] - prev["involuntary"]) / elapsed
+            rows.append(row)
+        # 정책 적용 스레드 먼저, 나머지는 CPU 사용률 순
+        rows.sort(key=lambda r: (r["tid"] not in roles, -r["cpu_pct"]))
+        return rows
+
+    @staticmethod
+    def format_rows(rows, min_cpu_pct=0.5):
+        """[Stats] 출력용 문자열 목록 (정책 적용 스레드는 항상, 나머지는 min_cpu_pct 이상만)"""
+        with _roles_lock:
+            roles = set(_thread_roles)
+        lines = []
+        for r in rows:
+            if r["tid"] not in roles and r["cpu_pct"] < min_cpu_pct:
+                continue
+            line = f"  {r['role']:<16} tid {r['tid']:<7} cpu {r['cpu_pct']:5.1f}%"
+            if r["voluntary_per_sec"] is not None:
+                line += f"  ctx vol {r['voluntary_per_sec']:6.1f}/s invol {r['involuntary_per_sec']:6.1f}/s"
+            if r["core"] is not None:
+                line += f"  core {r['core']}"
+            lines.append(line)
+        return lines
@@ -0,0 +1,348 @@
+"""
+vision_engine.py
+------------------------------------
+물체 감지 엔진 (카메라/UI/Firebase와 분리된 재사용 API)
+- VisionEngine.process_frame(frame): 프레임 1장 → FrameResult
+- VisionEngine.process_batch(frames): 여러 프레임을 스레드 풀로 병렬 처리
+  (스레드별 버퍼 재사용, OpenCV는 GIL을 해제하므로 코어 병렬 처리)
+- 최단축 계산 / 거리 계산 함수
+  · exact: 윤곽선 전체 점 탐색 (find_shortest_axis)
+  · fast : 중심 모멘트(mu20, mu02, mu11)로 단축 방향 계산 + 솎아낸 윤곽선에 벡터화 광선 교차
+           (axis_detection.geometry_mode = "fast")
+
+사용법 (exact / fast 속도 및 각도 오차 비교):
+    python vision_engine.py recordings --step 2 --repeat 20
+    python vision_engine.py frame.png
+------------------------------------
+"""
+
+import os
+import math
+import time
+import argparse
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from edge_pipeline import TiledEdgeExtractor, extract_edges
+
+
+# 윤곽선 기반 최단축 계산
+def find_shortest_axis(contour, center, angle_tolerance_rad=0.26):
+    """윤곽선의 중심에서 가장 가까운 점(A)과 그 반대쪽 점(B)을 찾아 각도/길이 계산"""
+    distances = [(np.sqrt((pt[0][0] - center[0])**2 + (pt[0][1] - center[1])**2), pt[0]) for pt in contour]
+    distances.sort(key=lambda x: x[0])
+    point_A = distances[0][1]
+
+    angle_to_A = math.atan2(point_A[1] - center[1], point_A[0] - center[0])
+    opposite_angle = angle_to_A + math.pi
+
+    point_B = point_A
+    best_dist = float("inf")
+    for point in contour:
+        pt = point[0]
+        angle = math.atan2(pt[1] - center[1], pt[0] - center[0])
+        diff = abs(angle - opposite_angle)
+        if diff > math.pi:
+            diff = 2 * math.pi - diff
+        if diff < angle_tolerance_rad:
+            dist = np.sqrt((pt[0] - center[0])**2 + (pt[1] - center[1])**2)
+            if dist < best_dist:
+                best_dist = dist
+                point_B = pt
+
+    dx, dy = point_B[0] - point_A[0], point_B[1] - point_A[1]
+    angle_deg = math.degrees(math.atan2(dy, dx))
+    length = np.sqrt(dx**2 + dy**2)
+    return point_A, point_B, angle_deg, length
+
+
+# fast 모드에서 솎아낸 뒤에도 남겨야 하는 최소 윤곽선 점 수
+# (CHAIN_APPROX_SIMPLE 윤곽선은 사각형/다각형이면 꼭짓점 4~12개뿐이므로 솎아내면 모양이 무너짐)
+MIN_DECIMATED_POINTS = 64
+
+
+def effective_contour_step(step, num_points):
+    """솎아내기 간격 보정: 1 이상, 솎아낸 뒤 MIN_DECIMATED_POINTS개 이상 남도록 제한"""
+    return max(1, min(int(step), num_points // MIN_DECIMATED_POINTS))
+
+
+# 모멘트 기반 최단축 계산 (fast 모드)
+def find_moment_axis(contour, moments, center, step=1):
+    """
+    중심 모멘트로 구한 단축 방향 직선과 윤곽선의 교점 A, B 계산
+    - 주축 각도 theta = 0.5 * atan2(2*mu11, mu20 - mu02), 단축 = theta + 90°
+    - step개마다 1점씩 솎아낸 윤곽선의 선분과 직선의 교점을 numpy로 한 번에 계산
+      (점이 적은 윤곽선은 솎아내지 않음, effective_contour_step 참고)
+    - 중심에서 가까운 쪽 교점이 A (find_shortest_axis와 같은 방향 규칙)
+    교점을 찾지 못하면 (중심이 윤곽선 밖인 오목한 물체 등) None
+    """
+    theta = 0.5 * math.atan2(2.0 * moments["mu11"], moments["mu20"] - moments["mu02"])
+    minor = theta + math.pi / 2.0
+    ux, uy = math.cos(minor), math.sin(minor)
+
+    pts = contour[::effective_contour_step(step, len(contour)), 0, :].astype(np.float64)
+    pts -= center
+    nxt = np.roll(pts, -1, axis=0)
+    # 직선에서의 부호 거리 (직선 방향 벡터와의 외적)
+    s0 = pts[:, 0] * uy - pts[:, 1] * ux
+    s1 = nxt[:, 0] * uy - nxt[:, 1] * ux
+    crossing = (s0 * s1 <= 0) & (s0 != s1)
+    if not np.any(crossing):
+        return None
+    w = (s0[crossing] / (s0[crossing] - s1[crossing]))[:, None]
+    hits = pts[crossing] + w * (nxt[crossing] - pts[crossing])
+    t = hits[:, 0] * ux + hits[:, 1] * uy  # 직선 위 위치 (중심 기준)
+
+    pos, neg = t > 0, t <= 0
+    if not np.any(pos) or not np.any(neg):
+        return None
+    t_pos = t[pos].min()
+    t_neg = t[neg].max()
+    if t_pos <= -t_neg:
+        a, b = t_pos, t_neg
+    else:
+        a, b = t_neg, t_pos
+    point_A = np.rint((center[0] + a * ux, center[1] + a * uy)).astype(int)
+    point_B = np.rint((center[0] + b * ux, center[1] + b * uy)).astype(int)
+    angle_deg = math.degrees(math.atan2((b - a) * uy, (b - a) * ux))
+    return point_A, point_B, angle_deg, abs(b - a)
+
+
+# 거리 계산 (삼각측량)
+def calculate_distance(pixel_length, real_length_mm, img_width, hfov_deg, fov_correction=1.0):
+    if pixel_length <= 0:
+        return 0.0
+    hfov_rad = math.radians(hfov_deg) * fov_correction
+    return (real_length_mm * img_width) / (2.0 * pixel_length * math.tan(hfov_rad / 2.0))
+
+
+@dataclass
+class Detection:
+    """물체 감지 결과"""
+    cx: int
+    cy: int
+    angle: float          # 최단축 각도 (deg)
+    distance: float       # 추정 거리 (mm)
+    area: float           # 윤곽선 면적 (px²)
+    axis_length: float    # 최단축 픽셀 길이
+    point_A: tuple
+    point_B: tuple
+    contour: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def as_dict(self):
+        """run_vision_loop / FlightRecorder에서 쓰는 딕셔너리 형식"""
+        return {"cx": self.cx, "cy": self.cy, "angle": self.angle, "dist": self.distance, "area": self.area}
+
+
+@dataclass
+class FrameResult:
+    """프레임 처리 결과"""
+    detection: Optional[Detection]
+    timings: dict                                  # 단계별 처리 시간 (ms): edges, contours, geometry, total
+    edges: Optional[np.ndarray] = field(default=None, repr=False)
+
+
+class VisionEngine:
+    """
+    경계 검출 → 최대 윤곽선 → 중심/최단축/거리 계산
+
+    사용 예:
+        engine = VisionEngine(load_config())
+        result = engine.process_frame(frame)
+        results = engine.process_batch(frames)
+    """
+
+    def __init__(self, config, max_workers=None):
+        self.cam_cfg = config["camera"]
+        self.reload(config)
+        self.max_workers = max_workers
+        self._edge_extractor = TiledEdgeExtractor()
+        self._pool = None
+        self._local = threading.local()  # 배치 처리 스레드별 버퍼
+
+    def reload(self, config):
+        """감지 관련 설정 갱신 (카메라 설정 제외)"""
+        self.edge_cfg = config["edge_detection"]
+        self.axis_cfg = config["axis_detection"]
+        self.obj_cfg = config["object"]
+        self.fast_geometry = self.axis_cfg.get("geometry_mode", "exact") == "fast"
+        self.contour_step = max(1, int(self.axis_cfg.get("contour_step", 1)))
+
+    def process_frame(self, frame, keep_edges=True):
+        """
+        프레임 1장 처리 (edge_detection.tiles 설정 시 타일 병렬 경계 검출)
+        keep_edges=True면 결과에 경계 영상 포함 (화면 표시용)
+        """
+        t_start = time.perf_counter()
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # GaussianBlur → Canny → dilate/erode/close (edge_pipeline.py)
+        edges = self._edge_extractor.extract(gray, self.edge_cfg)
+        return self._detect(edges, frame.shape[1], t_start, edges if keep_edges else None)
+
+    def process_batch(self, frames, keep_edges=False):
+        """
+        여러 프레임 병렬 처리 (입력 순서대로 FrameResult 목록 반환)
+        - 프레임 단위로 스레드 풀에 분배 (타일 분할은 사용하지 않음)
+        - 스레드별 gray/blur/edge 버퍼를 재사용하여 프레임마다 할당하지 않음
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="vision-batch")
+        return list(self._pool.map(lambda f: self._process_pooled(f, keep_edges), frames))
+
+    def _process_pooled(self, frame, keep_edges):
+        t_start = time.perf_counter()
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None or buffers["gray"].shape != frame.shape[:2]:
+            buffers = {"gray": np.empty(frame.shape[:2], dtype=np.uint8)}
+            self._local.buffers = buffers
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=buffers["gray"])
+        edges = extract_edges(gray, self.edge_cfg, buffers)
+        # 버퍼는 다음 프레임에서 덮어쓰므로 보관할 경우 복사
+        return self._detect(edges, frame.shape[1], t_start, edges.copy() if keep_edges else None)
+
+    def _detect(self, edges, img_width, t_start, keep_edges):
+        t_edges = time.perf_counter()
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        detection = None
+        c = max(contours, key=cv2.contourArea) if contours else None
+        area = cv2.contourArea(c) if c is not None else 0.0
+        t_contours = time.perf_counter()
+
+        if c is not None and area > self.edge_cfg["min_contour_area"]:
+            M = cv2.moments(c)
+            if M["m00"] != 0:
+                cx, cy = int(M["m10"]/M["m00"]), int(M["m01"]/M["m00"])
+                axis = find_moment_axis(c, M, (cx, cy), self.contour_step) if self.fast_geometry else None
+                if axis is None:
+                    axis = find_shortest_axis(c, (cx, cy), math.radians(self.axis_cfg["angle_tolerance_deg"]))
+                point_A, point_B, angle_deg, pix_len = axis
+                distance = calculate_distance(pix_len, self.obj_cfg["real_shortest_axis_mm"], img_width,
+                                              self.cam_cfg["hfov_degree"], self.cam_cfg["fov_correction_factor"])
+                detection = Detection(cx, cy, angle_deg, float(distance), area, float(pix_len),
+                                      tuple(int(v) for v in point_A), tuple(int(v) for v in point_B), c)
+        t_geometry = time.perf_counter()
+
+        timings = {
+            "edges": (t_edges - t_start) * 1000.0,
+            "contours": (t_contours - t_edges) * 1000.0,
+            "geometry": (t_geometry - t_contours) * 1000.0,
+            "total": (t_geometry - t_start) * 1000.0,
+        }
+        return FrameResult(detection, timings, keep_edges)
+
+    def close(self):
+        self._edge_extractor.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+def check_low_vertex_polygons(step, length_tol_px=2.0):
+    """
+    꼭짓점이 적은 다각형 윤곽선(CHAIN_APPROX_SIMPLE 사각형 등)에서 fast 모드 단축 길이 확인
+    200x80 사각형을 꼭짓점 4 / 8 / 12개, 0° / 30° 회전으로 만들어 단축 길이 80px와 비교
+    """
+    ok = True
+    for vertices in (4, 8, 12):
+        per_edge = vertices // 4
+        corners = np.array([[-100, -40], [100, -40], [100, 40], [-100, 40]], dtype=np.float64)
+        pts = [corners[i] + (corners[(i + 1) % 4] - corners[i]) * k / per_edge
+               for i in range(4) for k in range(per_edge)]
+        for rot_deg in (0, 30):
+            r = math.radians(rot_deg)
+            rot = np.array([[math.cos(r), -math.sin(r)], [math.sin(r), math.cos(r)]])
+            contour = np.rint(np.asarray(pts) @ rot.T + (400, 300)).astype(np.int32).reshape(-1, 1, 2)
+            M = cv2.moments(contour)
+            center = (int(M["m10"]/M["m00"]), int(M["m01"]/M["m00"]))
+            axis = find_moment_axis(contour, M, center, step)
+            length = axis[3] if axis else 0.0
+            passed = axis is not None and abs(length - 80.0) <= length_tol_px
+            ok &= passed
+            print(f"[Geometry] Check {vertices:>2} vertices, rot {rot_deg:>2}°: "
+                  f"axis {length:6.2f}px (expected 80) {'OK' if passed else 'FAIL'}")
+    return ok
+
+
+def main():
+    from config_loader import load_config
+    from frame_dataset import load_frame_groups
+
+    config = load_config()
+    axis_cfg = config["axis_detection"]
+
+    parser = argparse.ArgumentParser(description="최단축 계산 exact / fast 모드 비교")
+    parser.add_argument("frames", help="입력 이미지 또는 녹화 프레임 폴더")
+    parser.add_argument("--step", type=int, default=axis_cfg.get("contour_step", 1), help="fast 모드 윤곽선 솎아내기 간격")
+    parser.add_argument("--repeat", type=int, default=20, help="프레임별 반복 측정 횟수")
+    parser.add_argument("--limit", type=int, default=None, help="그룹당 최대 프레임 수")
+    args = parser.parse_args()
+
+    if not check_low_vertex_polygons(args.step):
+        print(f"[Geometry] ⚠️  fast 모드가 꼭짓점이 적은 윤곽선에서 틀린 단축을 계산합니다 (step={args.step})")
+
+    if os.path.isdir(args.frames):
+        frames = [f for group in load_frame_groups(args.frames, args.limit).values() for f in group]
+    else:
+        frame = cv2.imread(args.frames)
+        frames = [frame] if frame is not None else []
+    if not frames:
+        print(f"[ERROR] 프레임을 읽을 수 없습니다: {args.frames}")
+        return
+
+    tolerance = math.radians(axis_cfg["angle_tolerance_deg"])
+    exact_ms, fast_ms, angle_err, length_err, points = [], [], [], [], []
+    fallbacks = 0
+    for frame in frames:
+        edges = extract_edges(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), config["edge_detection"])
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            continue
+        c = max(contours, key=cv2.contourArea)
+        if cv2.contourArea(c) <= config["edge_detection"]["min_contour_area"]:
+            continue
+        M = cv2.moments(c)
+        if M["m00"] == 0:
+            continue
+        center = (int(M["m10"]/M["m00"]), int(M["m01"]/M["m00"]))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            exact = find_shortest_axis(c, center, tolerance)
+        exact_ms.append((time.perf_counter() - start) / args.repeat * 1000.0)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fast = find_moment_axis(c, M, center, args.step)
+        fast_ms.append((time.perf_counter() - start) / args.repeat * 1000.0)
+
+        points.append(len(c))
+        if fast is None:
+            fallbacks += 1
+            continue
+        # 최단축 방향은 180° 주기로 비교
+        angle_err.append(abs((fast[2] - exact[2] + 90.0) % 180.0 - 90.0))
+        length_err.append(fast[3] - exact[3])
+
+    if not exact_ms:
+        print("[Geometry] 감지된 물체 없음")
+        return
+    exact_avg, fast_avg = float(np.mean(exact_ms)), float(np.mean(fast_ms))
+    print(f"[Geometry] {len(exact_ms)} frames, contour {np.mean(points):.0f} points avg, step={args.step}")
+    print(f"[Geometry]  exact: {exact_avg:.3f} ms/frame")
+    print(f"[Geometry]   fast: {fast_avg:.3f} ms/frame ({exact_avg / fast_avg:.1f}x)")
+    if angle_err:
+        print(f"[Geometry] angle error: mean {np.mean(angle_err):.2f}°, p95 {np.percentile(angle_err, 95):.2f}°, "
+              f"max {np.max(angle_err):.2f}°")
+        print(f"[Geometry] axis length diff (fast - exact): mean {np.mean(length_err):+.2f}px, "
+              f"max |{np.max(np.abs(length_err)):.2f}|px")
+    if fallbacks:
+        print(f"[Geometry] ⚠️  fast 모드 교점 없음 {fallbacks}회 (exact로 대체됨)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,51 @@
 """
 vision_processor.py
 ------------------------------------
-영상 입력, 경계 검출, 좌표 계산 및 Firebase 전송 루프
-(main.py에서 호출)
+영상 입력, 화면 표시, 좌표 계산 및 Firebase 전송 루프
+(main.py에서 호출, 물체 감지는 vision_engine.VisionEngine)
 ------------------------------------
 """
 
+import os
 import cv2
-import math
 import time
 import numpy as np
-from datetime import datetime
 from firebase_manager import send_to_firebase
 from constants import SECTOR_ANSWERS
 from coordinate_transform import pixel_to_robot_coords
+from camera_capture import open_frame_source
+from flight_recorder import FlightRecorder
+from vision_engine import VisionEngine
+from runtime_policy import ThreadStats
 
 
-# 윤곽선 기반 최단축 계산
-def find_shortest_axis(contour, center, angle_tolerance_rad=0.26):
-    """윤곽선의 중심에서 가장 가까운 점(A)과 그 반대쪽 점(B)을 찾아 각도/길이 계산"""
-    distances = [(np.sqrt((pt[0][0] - center[0])**2 + (pt[0][1] - center[1])**2), pt[0]) for pt in contour]
-    distances.sort(key=lambda x: x[0])
-    point_A = distances[0][1]
-
-    angle_to_A = math.atan2(point_A[1] - center[1], point_A[0] - center[0])
-    opposite_angle = angle_to_A + math.pi
-
-    point_B = point_A
-    best_dist = float("inf")
-    for point in contour:
-        pt = point[0]
-        angle = math.atan2(pt[1] - center[1], pt[0] - center[0])
-        diff = abs(angle - opposite_angle)
-        if diff > math.pi:
-            diff = 2 * math.pi - diff
-        if diff < angle_tolerance_rad:
-            dist = np.sqrt((pt[0] - center[0])**2 + (pt[1] - center[1])**2)
-            if dist < best_dist:
-                best_dist = dist
-                point_B = pt
-
-    dx, dy = point_B[0] - point_A[0], point_B[1] - point_A[1]
-    angle_deg = math.degrees(math.atan2(dy, dx))
-    length = np.sqrt(dx**2 + dy**2)
-    return point_A, point_B, angle_deg, length
-
-
-# 거리 계산 (삼각측량)
-def calculate_distance(pixel_length, real_length_mm, img_width, hfov_deg, fov_correction=1.0):
-    if pixel_length <= 0:
-        return 0.0
-    hfov_rad = math.radians(hfov_deg) * fov_correction
-    return (real_length_mm * img_width) / (2.0 * pixel_length * math.tan(hfov_rad / 2.0))
+# 주기적 통계 출력 (프레임 처리 시간 + 스레드별 CPU/문맥 전환)
+def print_stats(frame_times, elapsed, thread_stats):
+    arr = np.asarray(frame_times)
+    print(f"[Stats] {len(arr) / elapsed:.1f} fps, frame p50 {np.percentile(arr, 50):.2f}ms, "
+          f"p95 {np.percentile(arr, 95):.2f}ms, max {arr.max():.2f}ms")
+    for line in ThreadStats.format_rows(thread_stats.sample()):
+        print(f"[Stats] {line}")
 
 
 # Vision 메인 루프
-def run_vision_loop(config, orders_ref, monitor, test_mode=False):
+def run_vision_loop(config, orders_ref, monitor, test_mode=False, tracer=None):
     """
     카메라 → 감지 → Firebase 전송 전체 루프
     
     Args:
         config: 설정 딕셔너리
-        orders_ref: Firebase orders 참조
+        orders_ref: 주문 저장소 (OrderStore)
         monitor: FirebaseMonitor 인스턴스
         test_mode: True면 테스트 모드 (Sector ID 기반), False면 실제 모드 (영상 계산)
+        tracer: OrderTracer 인스턴스 (None이면 지연시간 추적 안함)
     """
 
     # 설정 변수들 (R키로 재로드 가능)
     cam_cfg = config["camera"]
-    obj_cfg = config["object"]
-    edge_cfg = config["edge_detection"]
-    axis_cfg = config["axis_detection"]
     auto_cfg = config["auto_send"]
+    # 물체 감지 (edge_detection / axis_detection / object 설정 사용)
+    engine = VisionEngine(config)
     # calibration_points는 섹터별로 구분되어 있음
     # 섹터별 calibration_points
     calib_pts_config = config.get("calibration_points", {})
@@ -93,7 +67,6 @@ def run_vision_loop(config, orders_ref, monitor, test_mode=False):
         nonlocal calibration_points_sector1, calibration_points_sector2, calibration_points_sector3
         nonlocal robot_transform, pixel_calibration
         nonlocal base_roll, base_pitch, base_yaw, send_interval
-        nonlocal edge_cfg, axis_cfg, obj_cfg
         
         try:
             print("[DEBUG] Config 파일 읽기 시작...")
@@ -109,9 +82,11 @@ def run_vision_loop(config, orders_ref, monitor, test_mode=False):
             calibration_points_sector3 = calib_pts_config.get("sector3", [])
             robot_transform = new_config.get("robot_transform", robot_transform)
             pixel_calibration = new_config.get("pixel_calibration", pixel_calibration)
-            edge_cfg = new_config.get("edge_detection", edge_cfg)
-            axis_cfg = new_config.get("axis_detection", axis_cfg)
-            obj_cfg = new_config.get("object", obj_cfg)
+            engine.reload({
+                "edge_detection": new_config.get("edge_detection", engine.edge_cfg),
+                "axis_detection": new_config.get("axis_detection", engine.axis_cfg),
+                "object": new_config.get("object", engine.obj_cfg),
+            })
             
             # 자세각 업데이트
             base_roll = robot_transform.get("base_roll", 0.0)
@@ -135,13 +110,94 @@ def run_vision_loop(config, orders_ref, monitor, test_mode=False):
             print(f"[ERROR] 상세 정보:\n{traceback.format_exc()}\n")
             return False
 
-    cap = cv2.VideoCapture(cam_cfg["camera_number"])
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, cam_cfg["width"])
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, cam_cfg["height"])
+    # 섹터별 캘리브레이션 포인트 선택 (섹터 ID 없으면 sector2)
+    def select_calibration_points(sector_id):
+        if sector_id == 1:
+            return calibration_points_sector1
+        elif sector_id == 3:
+            return calibration_points_sector3
+        return calibration_points_sector2
+
+    # Pose 전송 (자동/수동 공통)
+    def send_pose(order_id, tag):
+        """
+        테스트 모드: Sector ID 기반 정답 좌표 전송
+        실제 모드: 카메라 영상에서 계산한 좌표 전송
+        Returns: 전송 여부
+        """
+        # 섹터 ID 가져오기 (Z값 결정용)
+        sector_id = monitor.sector_id if monitor else None
+
+        if test_mode:
+            if sector_id and sector_id in SECTOR_ANSWERS:
+                coords = SECTOR_ANSWERS[sector_id]
+                send_to_firebase(orders_ref, order_id, *coords)
+                if tracer:
+                    tracer.mark(order_id, "pose_written")
+                print(f"\n[{tag}] 전송 완료")
+                print(f"Order ID: {order_id}")
+                print(f"Sector: {sector_id} → X={coords[0]:.1f}, Y={coords[1]:.1f}, Z={coords[2]:.1f}")
+                print(f"Roll={coords[3]:.2f}, Pitch={coords[4]:.2f}, Yaw={coords[5]:.2f}\n")
+                return True
+            elif sector_id:
+                print(f"[{tag}] ⚠️  Invalid Sector ID: {sector_id} (expected 1, 2, or 3)")
+            else:
+                print(f"[{tag}] ⚠️  Sector ID not found in Firebase items[0].id")
+            return False
+
+        if not last_detection:
+            print(f"[{tag}] ⚠️  물체가 감지되지 않았습니다")
+            return False
+
+        cx = last_detection["cx"]
+        cy = last_detection["cy"]
+
+        # 픽셀 좌표 → 로봇 좌표 변환
+        robot_x, robot_y, robot_z, roll, pitch, yaw = pixel_to_robot_coords(
+            cx, cy, select_calibration_points(sector_id),
+            sector_id=sector_id,
+            sector_answers=SECTOR_ANSWERS,
+            base_roll=base_roll,
+            base_pitch=base_pitch,
+            base_yaw=base_yaw,
+            pixel_calibration=pixel_calibration
+        )
+        if tracer:
+            tracer.mark(order_id, "transformed")
+
+        send_to_firebase(orders_ref, order_id, robot_x, robot_y, robot_z, roll, pitch, yaw)
+        if tracer:
+            tracer.mark(order_id, "pose_written")
+        print(f"\n[{tag}] 전송 완료")
+        print(f"Order ID: {order_id}")
+        print(f"Pixel: ({cx}, {cy}) → Robot: X={robot_x:.2f}, Y={robot_y:.2f}, Z={robot_z:.2f}")
+        if sector_id:
+            print(f"Sector ID: {sector_id} (Z값: {robot_z:.2f}mm)")
+        print(f"Roll={roll:.2f}, Pitch={pitch:.2f}, Yaw={yaw:.2f}\n")
+        return True
+
+    # camera.source: device (카메라 직접) / frame_bus (캡처 데몬 공유)
+    cap = open_frame_source(cam_cfg)
 
     last_detection = None
     last_send_time = 0
 
+    # 프레임별 감지 결과/처리 시간 기록 (flight_recorder.enabled)
+    recorder = None
+    rec_cfg = config.get("flight_recorder", {})
+    if rec_cfg.get("enabled", False):
+        rec_path = rec_cfg.get("path", "flight_log.bin")
+        if not os.path.isabs(rec_path):
+            rec_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), rec_path)
+        recorder = FlightRecorder(rec_path, rec_cfg.get("capacity", 216000))
+
+    # runtime.stats_interval_sec마다 통계 출력 (0이면 출력 안함)
+    stats_interval = config.get("runtime", {}).get("stats_interval_sec", 0)
+    thread_stats = ThreadStats()
+    thread_stats.sample()
+    stats_start = time.perf_counter()
+    frame_times = []
+
     print("\n[Camera] Video stream opened.")
     if test_mode:
         print("[Mode] 테스트 모드: Sector ID 기반 정답 좌표 전송")
@@ -151,40 +207,44 @@ def run_vision_loop(config, orders_ref, monitor, test_mode=False):
     print("자동 모드: Firebase status=waiting_pose 감지 시 자동 전송\n")
 
     while True:
+        t_start = time.perf_counter()
         ok, frame = cap.read()
         if not ok:
             print("[ERROR] 카메라 프레임을 읽을 수 없습니다.")
             break
+        frame_time = time.time()
+        capture_ms = (time.perf_counter() - t_start) * 1000.0
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (edge_cfg["gaussian_blur_kernel"],) * 2, 0)
-        edges = cv2.Canny(blurred, edge_cfg["canny_threshold1"], edge_cfg["canny_threshold2"])
-        
-        # Morphological operations: 작은 디테일 제거, 외곽선만 남김
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-        edges = cv2.dilate(edges, kernel, iterations=2)  # 엣지 확장
-        edges = cv2.erode(edges, kernel, iterations=2)   # 다시 축소 (구멍 메우기)
-        edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)  # 닫기 연산
+        result = engine.process_frame(frame)
+        det = result.detection
+        edges = result.edges
 
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         display = frame.copy()
         H, W = frame.shape[:2]
 
-        if contours:
-            c = max(contours, key=cv2.contourArea)
-            area = cv2.contourArea(c)
-            if area > edge_cfg["min_contour_area"]:
-                M = cv2.moments(c)
-                if M["m00"] != 0:
-                    cx, cy = int(M["m10"]/M["m00"]), int(M["m01"]/M["m00"])
-                    point_A, point_B, angle_deg, pix_len = find_shortest_axis(c, (cx, cy), math.radians(axis_cfg["angle_tolerance_deg"]))
-                    distance = calculate_distance(pix_len, obj_cfg["real_shortest_axis_mm"], W, cam_cfg["hfov_degree"], cam_cfg["fov_correction_factor"])
+        if det:
+            cv2.drawContours(display, [det.contour], -1, (0, 255, 0), 2)
+            cv2.circle(display, (det.cx, det.cy), 5, (255, 0, 0), -1)
+            cv2.line(display, det.point_A, det.point_B, (0, 255, 255), 2)
+
+            last_detection = det.as_dict()
+
+            # 주문 감지 이후 첫 물체 감지 프레임 시각 기록 (캡처 시각 기준, 주문 감지 전에 캡처된 프레임은 tracer가 무시)
+            if tracer and monitor and monitor.auto_detect_flag["enabled"]:
+                tracer.mark(monitor.target_order_id, "detected", frame_time)
 
-                    cv2.drawContours(display, [c], -1, (0, 255, 0), 2)
-                    cv2.circle(display, (cx, cy), 5, (255, 0, 0), -1)
-                    cv2.line(display, tuple(point_A), tuple(point_B), (0, 255, 255), 2)
+        if recorder:
+            active_order = monitor.target_order_id if monitor and monitor.auto_detect_flag["enabled"] else None
+            recorder.record(frame_time, det.as_dict() if det else None,
+                            sector=monitor.sector_id if monitor else 0,
+                            order_id=active_order,
+                            timings=dict(result.timings, capture=capture_ms, total=capture_ms + result.timings["total"]))
 
-                    last_detection = {"cx": cx, "cy": cy, "angle": angle_deg, "dist": distance}
+        frame_times.append(capture_ms + result.timings["total"])
+        if stats_interval and time.perf_counter() - stats_start >= stats_interval:
+            print_stats(frame_times, time.perf_counter() - stats_start, thread_stats)
+            stats_start = time.perf_counter()
+            frame_times = []
 
         # 중앙 십자선
         cv2.line(display, (W//2, 0), (W//2, H), (80, 80, 80), 1)
@@ -194,65 +254,8 @@ def run_vision_loop(config, orders_ref, monitor, test_mode=False):
         if monitor and monitor.auto_detect_flag["enabled"]:
             now = time.time()
             if now - last_send_time > send_interval:
-                order_id = monitor.target_order_id
-                
-                if test_mode:
-                    # 테스트 모드: Sector ID 기반 정답 좌표 전송
-                    sector_id = monitor.sector_id
-                    
-                    if sector_id and sector_id in SECTOR_ANSWERS:
-                        coords = SECTOR_ANSWERS[sector_id]
-                        send_to_firebase(orders_ref, order_id, *coords)
-                        print(f"\n[AUTO] 전송 완료")
-                        print(f"Order ID: {order_id}")
-                        print(f"Sector: {sector_id} → X={coords[0]:.1f}, Y={coords[1]:.1f}, Z={coords[2]:.1f}")
-                        print(f"Roll={coords[3]:.2f}, Pitch={coords[4]:.2f}, Yaw={coords[5]:.2f}\n")
-                        last_send_time = now
-                    elif sector_id:
-                        print(f"[AUTO] ⚠️  Invalid Sector ID: {sector_id} (expected 1, 2, or 3)")
-                    else:
-                        print(f"[AUTO] ⚠️  Sector ID not found in Firebase items[0].id")
-                else:
-                    # 실제 모드: 카메라 영상에서 계산한 좌표 전송
-                    if last_detection:
-                        cx = last_detection["cx"]
-                        cy = last_detection["cy"]
-                        distance = last_detection["dist"]
-                        
-                        # 섹터 ID 가져오기 (Z값 결정용)
-                        sector_id = monitor.sector_id if monitor else None
-                        
-                        # 섹터별 캘리브레이션 포인트 선택
-                        if sector_id == 1:
-                            selected_calibration_points = calibration_points_sector1
-                        elif sector_id == 2:
-                            selected_calibration_points = calibration_points_sector2
-                        elif sector_id == 3:
-                            selected_calibration_points = calibration_points_sector3
-                        else:
-                            selected_calibration_points = calibration_points_sector2
-                        
-                        # 픽셀 좌표 → 로봇 좌표 변환
-                        robot_x, robot_y, robot_z, roll, pitch, yaw = pixel_to_robot_coords(
-                            cx, cy, selected_calibration_points,
-                            sector_id=sector_id,
-                            sector_answers=SECTOR_ANSWERS,
-                            base_roll=base_roll,
-                            base_pitch=base_pitch,
-                            base_yaw=base_yaw,
-                            pixel_calibration=pixel_calibration
-                        )
-                        
-                        send_to_firebase(orders_ref, order_id, robot_x, robot_y, robot_z, roll, pitch, yaw)
-                        print(f"\n[AUTO] 전송 완료")
-                        print(f"Order ID: {order_id}")
-                        print(f"Pixel: ({cx}, {cy}) → Robot: X={robot_x:.2f}, Y={robot_y:.2f}, Z={robot_z:.2f}")
-                        if sector_id:
-                            print(f"Sector ID: {sector_id} (Z값: {robot_z:.2f}mm)")
-                        print(f"Roll={roll:.2f}, Pitch={pitch:.2f}, Yaw={yaw:.2f}\n")
-                        last_send_time = now
-                    else:
-                        print(f"[AUTO] ⚠️  물체가 감지되지 않았습니다")
+                if send_pose(monitor.target_order_id, "AUTO"):
+                    last_send_time = now
 
         cv2.imshow("Camera2", display)
         cv2.imshow("Edges", edges)
@@ -267,65 +270,12 @@ def run_vision_loop(config, orders_ref, monitor, test_mode=False):
         elif key == ord(" "):
             # 수동 전송 모드
             order_id = monitor.target_order_id if monitor else auto_cfg["firebase_order_id"]
-            
-            if test_mode:
-                # 테스트 모드: Firebase에서 현재 섹터 ID 읽기
-                sector_id = monitor.sector_id if monitor else None
-                
-                if sector_id and sector_id in SECTOR_ANSWERS:
-                    coords = SECTOR_ANSWERS[sector_id]
-                    send_to_firebase(orders_ref, order_id, *coords)
-                    print(f"\n[MANUAL] 전송 완료")
-                    print(f"Order ID: {order_id}")
-                    print(f"Sector: {sector_id} → X={coords[0]:.1f}, Y={coords[1]:.1f}, Z={coords[2]:.1f}")
-                    print(f"Roll={coords[3]:.2f}, Pitch={coords[4]:.2f}, Yaw={coords[5]:.2f}\n")
-                    last_send_time = time.time()
-                elif sector_id:
-                    print(f"[MANUAL] ⚠️  Invalid Sector ID: {sector_id}")
-                else:
-                    print(f"[MANUAL] ⚠️  Sector ID not found. Check Firebase items[0].id")
-            else:
-                # 실제 모드: 카메라 영상에서 계산한 좌표 전송
-                if last_detection:
-                    cx = last_detection["cx"]
-                    cy = last_detection["cy"]
-                    distance = last_detection["dist"]
-                    
-                    # 섹터 ID 가져오기 (Z값 결정용)
-                    sector_id = monitor.sector_id if monitor else None
-                    
-                    # 섹터별 캘리브레이션 포인트 선택
-                    if sector_id == 1:
-                        selected_calibration_points = calibration_points_sector1
-                    elif sector_id == 2:
-                        selected_calibration_points = calibration_points_sector2
-                    elif sector_id == 3:
-                        selected_calibration_points = calibration_points_sector3
-                    else:
-                        selected_calibration_points = calibration_points_sector2
-                    
-                    # 픽셀 좌표 → 로봇 좌표 변환
-                    robot_x, robot_y, robot_z, roll, pitch, yaw = pixel_to_robot_coords(
-                        cx, cy, selected_calibration_points,
-                        sector_id=sector_id,
-                        sector_answers=SECTOR_ANSWERS,
-                        base_roll=base_roll,
-                        base_pitch=base_pitch,
-                        base_yaw=base_yaw,
-                        pixel_calibration=pixel_calibration
-                    )
-                    
-                    send_to_firebase(orders_ref, order_id, robot_x, robot_y, robot_z, roll, pitch, yaw)
-                    print(f"\n[MANUAL] 전송 완료")
-                    print(f"Order ID: {order_id}")
-                    print(f"Pixel: ({cx}, {cy}) → Robot: X={robot_x:.2f}, Y={robot_y:.2f}, Z={robot_z:.2f}")
-                    if sector_id:
-                        print(f"Sector ID: {sector_id} (Z값: {robot_z:.2f}mm)")
-                    print(f"Roll={roll:.2f}, Pitch={pitch:.2f}, Yaw={yaw:.2f}\n")
-                    last_send_time = time.time()
-                else:
-                    print(f"[MANUAL] ⚠️  물체가 감지되지 않았습니다")
+            if send_pose(order_id, "MANUAL"):
+                last_send_time = time.time()
 
     cap.release()
+    engine.close()
+    if recorder:
+        recorder.close()
     cv2.destroyAllWindows()
     print("[INFO] Vision loop 종료 완료.")